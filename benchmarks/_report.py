@@ -0,0 +1,86 @@
+"""
+Shared JSON report format of the benchmark suite (micro.py, load.py,
+serving_layout.py, compare.py).
+
+license: MIT
+
+A report records what was run and on what, so that two reports can be compared:
+    {"kind": "micro" | "load" | "layout", "environment": {...}, "settings": {...}, "results": [{"name": ..., ...}]}
+"""
+
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from importlib import metadata
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+EXAMPLE_IMAGES = sorted(
+    path
+    for path in (ROOT / "example_usage").iterdir()
+    if path.suffix.lower() in (".png", ".jpg", ".jpeg", ".gif")
+)
+# Environment variables that change server behaviour and therefore the results.
+SERVER_SETTINGS_PREFIX = "DECIMER_"
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _package_version(name: str) -> str | None:
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def environment() -> dict:
+    """Describes the code, packages and machine a benchmark ran on."""
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "packages": {
+            name: _package_version(name)
+            for name in (
+                "tensorflow",
+                "decimer",
+                "decimer_image_classifier",
+                "fastapi",
+                "uvicorn",
+                "pillow",
+            )
+        },
+        "settings": {
+            name: value
+            for name, value in sorted(os.environ.items())
+            if name.startswith(SERVER_SETTINGS_PREFIX)
+        },
+    }
+
+
+def write_report(path: Path, kind: str, settings: dict, results: list[dict]) -> None:
+    report = {
+        "kind": kind,
+        "environment": environment(),
+        "settings": settings,
+        "results": results,
+    }
+    path.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"Wrote {path}", file=sys.stderr)
@@ -0,0 +1,100 @@
+"""
+Numerical-equivalence check for the batched classifier preprocessing.
+
+license: MIT
+
+Compares DecimerImageClassifier._get_model_inputs (single channel, batched
+padding, optionally reducing_gap) against the original PIL chain
+(_get_resized_grayscale_image) on the example images plus synthetic large scans,
+transparent and palette images. Reports pixel and classifier score differences,
+whether the decision at --threshold flips, and the preprocessing time of both
+paths; exits with status 1 when a difference exceeds the tolerances.
+
+Usage:
+    python benchmarks/check_classifier_preprocessing.py [extra images ...]
+    python benchmarks/check_classifier_preprocessing.py --reducing-gap 3 scans/*.png
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import tensorflow as tf
+from decimer_image_classifier import DecimerImageClassifier
+from PIL import Image
+
+EXAMPLES = Path(__file__).resolve().parents[1] / "example_usage"
+
+
+def _sample_images(extra_paths: list[str]) -> dict[str, Image.Image]:
+    structure = Image.open(EXAMPLES / "structure.png")
+    structure.load()
+    samples = {
+        "structure.png": structure,
+        "not_structure.gif": Image.open(EXAMPLES / "not_structure.gif"),
+        "structure_rgba": structure.convert("RGBA"),
+        "scan_2480x3508_rgb": structure.convert("RGB").resize((2480, 3508)),
+        "scan_4960x7016_l": structure.convert("L").resize((4960, 7016)),
+        "strip_1600x40_rgba": structure.convert("RGBA").resize((1600, 40)),
+    }
+    for path in extra_paths:
+        samples[path] = Image.open(path)
+    return samples
+
+
+def _timed(func, *args) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("images", nargs="*", help="additional images to compare")
+    parser.add_argument("--max-mean-pixel-diff", type=float, default=0.5)
+    parser.add_argument("--max-score-diff", type=float, default=1e-5)
+    parser.add_argument(
+        "--threshold", type=float, default=0.000089, help="decision threshold"
+    )
+    parser.add_argument(
+        "--reducing-gap", type=float, help="check this opt-in reducing_gap as well"
+    )
+    args = parser.parse_args()
+
+    classifier = DecimerImageClassifier(reducing_gap=args.reducing_gap)
+    failed = False
+
+    print(
+        f"{'image':<22} {'max px':>6} {'mean px':>8} {'score diff':>10} "
+        f"{'ref ms':>8} {'new ms':>8}"
+    )
+    for name, img in _sample_images(args.images).items():
+        ref_seconds, ref_img = _timed(classifier._get_resized_grayscale_image, img)
+        reference = tf.keras.preprocessing.image.img_to_array(ref_img)[np.newaxis]
+        new_seconds, batch = _timed(classifier._get_model_inputs, [img])
+
+        pixel_diff = np.abs(reference - batch)
+        ref_score = float(classifier._score_fn(reference)[0])
+        new_score = float(classifier._score_fn(batch)[0])
+        score_diff = abs(ref_score - new_score)
+        flipped = (ref_score < args.threshold) != (new_score < args.threshold)
+        ok = (
+            pixel_diff.mean() <= args.max_mean_pixel_diff
+            and score_diff <= args.max_score_diff
+            and not flipped
+        )
+        failed = failed or not ok
+        note = "  <-- decision flips" if flipped else "  <-- out of tolerance"
+        print(
+            f"{name[:22]:<22} {pixel_diff.max():>6.0f} {pixel_diff.mean():>8.4f} "
+            f"{score_diff:>10.2e} {ref_seconds * 1000:>8.1f} {new_seconds * 1000:>8.1f}"
+            f"{'' if ok else note}"
+        )
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
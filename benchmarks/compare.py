@@ -0,0 +1,90 @@
+"""
+Compares two benchmark reports (micro.py, load.py or serving_layout.py) and gates on
+regressions.
+
+license: MIT
+
+Results are matched by name. Latencies (median_ms for microbenchmarks, p50/p95/p99_ms
+for load and layout runs) regress when they grow, requests_per_second when it drops.
+Exits with status 1 when any metric is worse than the baseline by more than
+--threshold, so a server upgrade or DECIMER bump can be gated on it. Differences in the recorded
+environment (machine, packages, DECIMER_* settings) are listed first, since results
+are only comparable on the same machine and settings.
+
+Usage:
+    python benchmarks/compare.py baseline.json candidate.json --threshold 0.10
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+LOWER_IS_BETTER = ("median_ms", "p50_ms", "p95_ms", "p99_ms")
+HIGHER_IS_BETTER = ("requests_per_second",)
+
+
+def _environment_differences(baseline: dict, candidate: dict) -> list[str]:
+    differences = []
+    for key in ("machine", "cpu_count", "python", "packages", "settings"):
+        before, after = baseline.get(key), candidate.get(key)
+        if before != after:
+            differences.append(f"{key}: {before} -> {after}")
+    return differences
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("candidate", type=Path)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="allowed relative slowdown, e.g. 0.10 for 10%%",
+    )
+    args = parser.parse_args()
+
+    baseline = json.loads(args.baseline.read_text())
+    candidate = json.loads(args.candidate.read_text())
+    if baseline["kind"] != candidate["kind"]:
+        print(f"Cannot compare a {baseline['kind']} with a {candidate['kind']} report.")
+        return 2
+
+    for difference in _environment_differences(
+        baseline["environment"], candidate["environment"]
+    ):
+        print(f"note: environment differs, {difference}")
+    for key in sorted(set(baseline["settings"]) | set(candidate["settings"])):
+        before, after = baseline["settings"].get(key), candidate["settings"].get(key)
+        if before != after:
+            print(f"note: run settings differ, {key}: {before} -> {after}")
+
+    baseline_results = {result["name"]: result for result in baseline["results"]}
+    regressions = 0
+    print(f"{'result':<40} {'metric':<20} {'baseline':>10} {'candidate':>10} {'change':>8}")
+    for result in candidate["results"]:
+        before = baseline_results.get(result["name"])
+        if before is None:
+            print(f"{result['name']:<40} (not in baseline)")
+            continue
+        for metric in LOWER_IS_BETTER + HIGHER_IS_BETTER:
+            if metric not in result or metric not in before or not before[metric]:
+                continue
+            change = result[metric] / before[metric] - 1
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            flag = ""
+            if worse > args.threshold:
+                flag = "  REGRESSION"
+                regressions += 1
+            print(
+                f"{result['name']:<40} {metric:<20} {before[metric]:>10} "
+                f"{result[metric]:>10} {change:>+8.1%}{flag}"
+            )
+
+    print(f"{regressions} regression(s) beyond {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,237 @@
+"""
+HTTP load generator for /image2smiles/ at fixed concurrency or fixed arrival rate.
+
+license: MIT
+
+Closed loop (--concurrency N): N clients each send the next request as soon as the
+previous one returns. Open loop (--rate R): requests arrive at R per second with
+exponential inter-arrival times drawn from a seeded generator, whether or not earlier
+requests have finished; latency is measured from the scheduled arrival, so queueing
+in the client is counted as it would be for real users.
+Requests cycle through the images of example_usage/ (or --images). By default every
+request carries a unique suffix after the image data, so the server's result cache
+never answers and every request runs the models (--allow-cache-hits to turn off).
+Reports throughput, error counts and p50/p95/p99 latency per level; with --json the
+report also records the environment. Compare two reports with benchmarks/compare.py.
+
+Usage:
+    python benchmarks/load.py --concurrency 1 4 16 --requests 200 --json load.json
+    python benchmarks/load.py --rate 2 5 10 --duration 60 --host 192.168.1.10
+"""
+
+import argparse
+import base64
+import itertools
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+from _report import EXAMPLE_IMAGES, write_report
+
+
+class _Client:
+    """Builds and sends /image2smiles/ requests, one session per thread."""
+
+    def __init__(self, args: argparse.Namespace):
+        self.url = f"http://{args.host}:{args.port}/image2smiles/"
+        self.images = [path.read_bytes() for path in args.images]
+        self.binary = not args.base64
+        self.unique = not args.allow_cache_hits
+        self.params = {
+            "is_hand_drawn": str(args.hand_drawn).lower(),
+            "classify_image": str(not args.no_classify).lower(),
+        }
+        self.timeout = args.timeout
+        self._counter = itertools.count()
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        if not hasattr(self._local, "session"):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def send(self) -> int | None:
+        """Sends one request; returns the status code, or None on connection errors."""
+        number = next(self._counter)
+        image = self.images[number % len(self.images)]
+        if self.unique:
+            # Decoders stop at the end-of-image marker, so trailing bytes only
+            # change the cache key.
+            image += f"decimer-load-{time.time_ns()}-{number}".encode()
+        try:
+            if self.binary:
+                response = self._session().post(
+                    self.url,
+                    data=image,
+                    params=self.params,
+                    headers={"Content-Type": "application/octet-stream"},
+                    timeout=self.timeout,
+                )
+            else:
+                response = self._session().post(
+                    self.url,
+                    data={
+                        "encoded_image": base64.b64encode(image).decode(),
+                        **self.params,
+                    },
+                    timeout=self.timeout,
+                )
+        except requests.exceptions.RequestException:
+            return None
+        return response.status_code
+
+
+def _summarize(samples: list[tuple[float, int | None]], elapsed: float) -> dict:
+    latencies = sorted(latency for latency, _ in samples)
+    status_counts: dict[str, int] = {}
+    for _, status in samples:
+        status_counts[str(status)] = status_counts.get(str(status), 0) + 1
+
+    def percentile(fraction: float) -> float:
+        if not latencies:
+            return 0.0
+        index = min(len(latencies) - 1, int(fraction * len(latencies)))
+        return round(latencies[index] * 1000, 1)
+
+    return {
+        "requests": len(samples),
+        "errors": sum(1 for _, status in samples if status != 200),
+        "status_counts": status_counts,
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(len(samples) / elapsed, 3) if elapsed else 0.0,
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+        "max_ms": percentile(1.0),
+    }
+
+
+def _timed_send(client: _Client, started: float) -> tuple[float, int | None]:
+    status = client.send()
+    return time.perf_counter() - started, status
+
+
+def _run_closed_loop(
+    client: _Client, concurrency: int, args: argparse.Namespace
+) -> dict:
+    samples: list[tuple[float, int | None]] = []
+    lock = threading.Lock()
+    remaining = itertools.count()
+    deadline = None
+
+    def worker() -> None:
+        while True:
+            if args.duration:
+                if time.perf_counter() >= deadline:
+                    return
+            elif next(remaining) >= args.requests:
+                return
+            sample = _timed_send(client, time.perf_counter())
+            with lock:
+                samples.append(sample)
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(lambda _: client.send(), range(args.warmup)))
+        start = time.perf_counter()
+        deadline = start + (args.duration or 0)
+        for _ in range(concurrency):
+            pool.submit(worker)
+    return _summarize(samples, time.perf_counter() - start)
+
+
+def _run_open_loop(client: _Client, rate: float, args: argparse.Namespace) -> dict:
+    arrivals = random.Random(args.seed)
+    futures = []
+    with ThreadPoolExecutor(args.max_in_flight) as pool:
+        list(pool.map(lambda _: client.send(), range(args.warmup)))
+        start = time.perf_counter()
+        scheduled = start
+        sent = 0
+        while True:
+            scheduled += arrivals.expovariate(rate)
+            if args.duration:
+                if scheduled - start >= args.duration:
+                    break
+            elif sent >= args.requests:
+                break
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            futures.append(pool.submit(_timed_send, client, scheduled))
+            sent += 1
+        samples = [future.result() for future in futures]
+    return _summarize(samples, time.perf_counter() - start)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    load = parser.add_mutually_exclusive_group(required=True)
+    load.add_argument(
+        "--concurrency", type=int, nargs="+", help="closed-loop client counts"
+    )
+    load.add_argument(
+        "--rate", type=float, nargs="+", help="open-loop arrival rates (requests/s)"
+    )
+    parser.add_argument(
+        "--requests", type=int, default=200, help="requests per level (default)"
+    )
+    parser.add_argument(
+        "--duration", type=float, help="seconds per level instead of --requests"
+    )
+    parser.add_argument("--warmup", type=int, default=10, help="untimed requests first")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--images", type=Path, nargs="+", default=EXAMPLE_IMAGES)
+    parser.add_argument(
+        "--base64", action="store_true", help="send base64 form fields, not raw bytes"
+    )
+    parser.add_argument("--hand-drawn", action="store_true")
+    parser.add_argument("--no-classify", action="store_true")
+    parser.add_argument("--allow-cache-hits", action="store_true")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the arrival times")
+    parser.add_argument(
+        "--max-in-flight", type=int, default=256, help="open-loop client threads"
+    )
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--json", type=Path, help="write the report to this file")
+    args = parser.parse_args()
+
+    client = _Client(args)
+    if args.concurrency:
+        levels = [(f"concurrency={n}", n) for n in args.concurrency]
+    else:
+        levels = [(f"rate={rate:g}/s", rate) for rate in args.rate]
+
+    results = []
+    print(
+        f"{'level':>16} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} errors"
+    )
+    for name, level in levels:
+        if args.concurrency:
+            summary = _run_closed_loop(client, level, args)
+        else:
+            summary = _run_open_loop(client, level, args)
+        result = {"name": name, **summary}
+        results.append(result)
+        print(
+            f"{name:>16} {result['requests_per_second']:>8} {result['p50_ms']:>8} "
+            f"{result['p95_ms']:>8} {result['p99_ms']:>8} {result['errors']}"
+        )
+
+    if args.json:
+        settings = {
+            key: value if not isinstance(value, list) else [str(v) for v in value]
+            for key, value in vars(args).items()
+            if key != "json"
+        }
+        write_report(args.json, "load", settings, results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
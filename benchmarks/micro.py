@@ -0,0 +1,227 @@
+"""
+Microbenchmarks of the server's hot functions.
+
+license: MIT
+
+Times request parsing (_extract_request_params for form, JSON and binary bodies),
+image decoding, the classifier preprocessing helpers, get_classifier_score and
+_predict_smiles for both DECIMER models, in-process and without HTTP.
+Every benchmark is warmed up, calibrated to run at least --min-time seconds per
+round and repeated --repeats times with the garbage collector paused; the report
+gives min/median/mean/stdev per call. Server settings (DECIMER_BACKEND,
+DECIMER_TF_*_OP_THREADS, ...) are read from the environment as by the server and
+recorded in the JSON report. Compare two reports with benchmarks/compare.py.
+
+Usage:
+    python benchmarks/micro.py --json micro.json
+    python benchmarks/micro.py --filter classifier --repeats 20
+"""
+
+import argparse
+import asyncio
+import base64
+import gc
+import json
+import statistics
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+from urllib.parse import urlencode
+
+import numpy as np
+from PIL import Image
+from starlette.requests import Request
+
+from _report import ROOT, write_report
+
+sys.path.insert(0, str(ROOT))
+
+import decimer_server as ds  # noqa: E402
+
+
+def _make_request(body: bytes, content_type: str) -> Request:
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/image2smiles/",
+        "query_string": b"",
+        "headers": [
+            (b"content-type", content_type.encode()),
+            (b"content-length", str(len(body)).encode()),
+        ],
+    }
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    return Request(scope, receive)
+
+
+def _request_benchmarks(image_bytes: bytes) -> dict[str, Callable]:
+    loop = asyncio.new_event_loop()
+    encoded = base64.b64encode(image_bytes).decode()
+    bodies = {
+        "form": (
+            urlencode({"encoded_image": encoded, "is_hand_drawn": "false"}).encode(),
+            "application/x-www-form-urlencoded",
+        ),
+        "json": (
+            json.dumps({"encoded_image": encoded, "is_hand_drawn": False}).encode(),
+            "application/json",
+        ),
+        "binary": (image_bytes, "application/octet-stream"),
+    }
+
+    def parse(body: bytes, content_type: str) -> Callable:
+        return lambda: loop.run_until_complete(
+            ds._extract_request_params(_make_request(body, content_type))
+        )
+
+    return {
+        f"extract_request_params[{name}]": parse(*body)
+        for name, body in bodies.items()
+    }
+
+
+def _classifier_benchmarks(pixels: np.ndarray) -> dict[str, Callable]:
+    # The classifier is looked up at call time: it is loaded on first use.
+    scan = np.asarray(Image.fromarray(pixels).resize((2480, 3508)))
+
+    def classifier():
+        return ds.backend.classifier
+
+    return {
+        "classifier_preprocess[single]": lambda: classifier()._get_model_inputs(
+            [pixels]
+        ),
+        "classifier_preprocess[scan_2480x3508]": lambda: classifier()._get_model_inputs(
+            [scan]
+        ),
+        "classifier_preprocess[batch8]": lambda: classifier()._get_model_inputs(
+            [pixels] * 8
+        ),
+        "get_classifier_score": lambda: classifier().get_classifier_score(pixels),
+        "get_classifier_scores[batch8]": lambda: classifier().get_classifier_scores(
+            [pixels] * 8
+        ),
+    }
+
+
+def _decimer_benchmarks(pixels: np.ndarray) -> dict[str, Callable]:
+    decoded = {}
+
+    def predict(hand_drawn: bool) -> Callable:
+        def run():
+            if "image" not in decoded:
+                decoded["image"] = ds.backend.preprocess(pixels)
+            return ds._predict_smiles(decoded["image"], hand_drawn)
+
+        return run
+
+    return {
+        "decimer_preprocess": lambda: ds.backend.preprocess(pixels),
+        "predict_smiles[DECIMER_V2]": predict(False),
+        "predict_smiles[DECIMER_Hand_drawn]": predict(True),
+    }
+
+
+def _measure(func: Callable, args: argparse.Namespace) -> dict:
+    for _ in range(args.warmup):
+        func()
+
+    # Calibrate like timeit.autorange: calls per round so a round takes >= min_time.
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        if time.perf_counter() - start >= args.min_time:
+            break
+        number *= 2
+
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            samples.append((time.perf_counter() - start) / number)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    return {
+        "number": number,
+        "repeats": args.repeats,
+        "min_ms": round(min(samples) * 1000, 4),
+        "median_ms": round(statistics.median(samples) * 1000, 4),
+        "mean_ms": round(statistics.mean(samples) * 1000, 4),
+        "stdev_ms": round(statistics.stdev(samples) * 1000, 4)
+        if len(samples) > 1
+        else 0.0,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--image", type=Path, default=ROOT / "example_usage" / "structure.png"
+    )
+    parser.add_argument(
+        "--filter", default="", help="only run benchmarks whose name contains this"
+    )
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument(
+        "--min-time", type=float, default=0.2, help="seconds per timed round"
+    )
+    parser.add_argument("--json", type=Path, help="write the report to this file")
+    args = parser.parse_args()
+
+    image_bytes = args.image.read_bytes()
+    pixels, classifier_pixels = ds._decode_pixels(image_bytes)
+    ds._configure_worker()
+
+    # (model loader, benchmarks); models are loaded before the first selected
+    # benchmark of their group.
+    groups: list[tuple[Callable | None, dict[str, Callable]]] = [
+        (None, _request_benchmarks(image_bytes)),
+        (None, {"decode_pixels": lambda: ds._decode_pixels(image_bytes)}),
+        (ds._load_classifier, _classifier_benchmarks(classifier_pixels)),
+        (ds._load_decimer, _decimer_benchmarks(pixels)),
+    ]
+    results = []
+    print(f"{'benchmark':<40} {'median ms':>10} {'min ms':>10} {'stdev ms':>10}")
+    for load, benchmarks in groups:
+        selected = {
+            name: func for name, func in benchmarks.items() if args.filter in name
+        }
+        if selected and load is not None:
+            load()
+        if load is ds._load_classifier and getattr(ds.backend, "classifier", None) is None:
+            continue  # the stub backend has no classifier
+        for name, func in selected.items():
+            result = {"name": name, **_measure(func, args)}
+            results.append(result)
+            print(
+                f"{name:<40} {result['median_ms']:>10.3f} {result['min_ms']:>10.3f} "
+                f"{result['stdev_ms']:>10.3f}"
+            )
+
+    if args.json:
+        settings = {
+            "image": str(args.image),
+            "repeats": args.repeats,
+            "warmup": args.warmup,
+            "min_time": args.min_time,
+            "backend": ds.backend.name,
+        }
+        write_report(args.json, "micro", settings, results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+"""
+Bytes saved and end-to-end latency of client-side downscaling (DecimerAPI max_side).
+
+license: MIT
+
+Converts the same images once per mode: "original" (files sent unchanged) and one
+mode per --max-side value. For every mode it reports the uploaded bytes, the client
+time spent preparing the payload and the end-to-end latency per image, plus the
+server-side image decode time taken from the Server-Timing header.
+Start the server with DECIMER_CACHE_MAX_ENTRIES=0 so that every request runs the models.
+
+Usage:
+    python benchmarks/payload_compaction.py scans/ --max-side 1024 512
+    python benchmarks/payload_compaction.py scans/ --offline --json payload.json
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+from decimerapi import DecimerAPI
+
+ROOT = Path(__file__).resolve().parents[1]
+IMAGE_SUFFIXES = (".png", ".jpg", ".jpeg", ".gif")
+
+
+def _collect_images(paths: list[Path]) -> list[Path]:
+    images = []
+    for path in paths:
+        if path.is_dir():
+            images += sorted(
+                p for p in path.rglob("*") if p.suffix.lower() in IMAGE_SUFFIXES
+            )
+        else:
+            images.append(path)
+    return images
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def _run_mode(
+    api: DecimerAPI, images: list[Path], args: argparse.Namespace
+) -> dict:
+    original_bytes = uploaded_bytes = 0
+    prepare_seconds, latencies, decode_ms = [], [], []
+    errors = 0
+    for image in images:
+        original_bytes += image.stat().st_size
+        start = time.perf_counter()
+        try:
+            payload = api._load_image_bytes(image)
+        except (OSError, ValueError):
+            errors += 1
+            continue
+        prepare_seconds.append(time.perf_counter() - start)
+        uploaded_bytes += len(payload)
+        if args.offline:
+            continue
+
+        start = time.perf_counter()
+        result = api.call_image2smiles_with_meta(
+            image, args.hand_drawn, server_timing=True
+        )
+        latencies.append(time.perf_counter() - start)
+        if result is None:
+            errors += 1
+            continue
+        decode_ms.append(result.get("server_timing", {}).get("image_decode", 0.0))
+
+    summary = {
+        "images": len(images),
+        "errors": errors,
+        "original_bytes": original_bytes,
+        "uploaded_bytes": uploaded_bytes,
+        "bytes_saved": round(1 - uploaded_bytes / original_bytes, 4)
+        if original_bytes
+        else 0.0,
+        "prepare_ms_mean": round(
+            1000 * sum(prepare_seconds) / max(len(prepare_seconds), 1), 2
+        ),
+    }
+    if latencies:
+        summary.update(
+            {
+                "p50_ms": round(1000 * _percentile(latencies, 0.50), 1),
+                "p95_ms": round(1000 * _percentile(latencies, 0.95), 1),
+                "server_decode_ms_mean": round(sum(decode_ms) / max(len(decode_ms), 1), 2),
+            }
+        )
+    return summary
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "images",
+        nargs="*",
+        type=Path,
+        default=[ROOT / "example_usage" / "structure.png"],
+        help="image files or directories",
+    )
+    parser.add_argument("--max-side", type=int, nargs="+", default=[1024, 512])
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--hand-drawn", action="store_true")
+    parser.add_argument(
+        "--offline", action="store_true", help="only measure payload sizes, no server"
+    )
+    parser.add_argument("--json", type=Path, help="also write the results to this file")
+    args = parser.parse_args()
+
+    images = _collect_images(args.images)
+    modes = [("original", None)] + [(f"max_side={side}", side) for side in args.max_side]
+    results = []
+    print(
+        f"{'mode':>15} {'uploaded':>12} {'saved':>7} {'prep ms':>8} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'decode ms':>9}"
+    )
+    for mode, max_side in modes:
+        with DecimerAPI(args.host, args.port, max_side=max_side) as api:
+            result = {"mode": mode, **_run_mode(api, images, args)}
+        results.append(result)
+        print(
+            f"{mode:>15} {result['uploaded_bytes']:>12} {result['bytes_saved']:>7.1%} "
+            f"{result['prepare_ms_mean']:>8} {result.get('p50_ms', '-'):>8} "
+            f"{result.get('p95_ms', '-'):>8} {result.get('server_decode_ms_mean', '-'):>9}"
+        )
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
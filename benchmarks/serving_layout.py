@@ -0,0 +1,163 @@
+"""
+Throughput/latency benchmark for multi-process CPU serving layouts.
+
+license: MIT
+
+Starts decimer_server once per layout "<processes>x<intra_op_threads>", e.g. 4x2
+for four worker processes with two TensorFlow intra-op threads each, waits until
+it reports ready, sends a fixed number of /image2smiles/ requests from a pool of
+concurrent clients and prints requests per second and latency percentiles.
+The result cache is disabled and every request carries a unique suffix after the
+image data, so neither the cache nor the coalescing of identical in-flight
+requests answers and every request runs the models.
+
+Usage:
+    python benchmarks/serving_layout.py 1x8 2x4 4x2 8x1 --concurrency 16
+    python benchmarks/serving_layout.py 2x4 4x2 --affinity auto --json layouts.json
+
+The --json report has the format of benchmarks/_report.py, one result per layout,
+so two runs can be gated with compare.py like load.py reports.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+from _report import ROOT, write_report
+
+
+def _parse_layout(layout: str) -> tuple[int, int]:
+    processes, _, threads = layout.lower().partition("x")
+    return int(processes), int(threads or 0)
+
+
+def _start_server(
+    processes: int, threads: int, args: argparse.Namespace
+) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "DECIMER_WORKER_PROCESSES": str(processes),
+        "DECIMER_TF_INTRA_OP_THREADS": str(threads),
+        "DECIMER_TF_INTER_OP_THREADS": str(args.inter_op_threads),
+        "DECIMER_CPU_AFFINITY": args.affinity if args.affinity != "none" else "",
+        "DECIMER_CACHE_MAX_ENTRIES": "0",
+        "DECIMER_CACHE_DB": "",
+    }
+    command = [
+        sys.executable, "-m", "uvicorn", "decimer_server:app",
+        "--port", str(args.port), "--workers", str(processes), "--log-level", "warning",
+    ]
+    return subprocess.Popen(command, cwd=ROOT, env=env)
+
+
+def _wait_until_ready(url: str, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(f"{url}/health/ready", timeout=5).status_code == 200:
+                return
+        except requests.exceptions.RequestException:
+            pass
+        time.sleep(1)
+    raise TimeoutError(f"server at {url} did not become ready within {timeout}s")
+
+
+def _run_load(url: str, image: bytes, args: argparse.Namespace) -> dict:
+    local = threading.local()
+    params = {"is_hand_drawn": str(args.hand_drawn).lower()}
+
+    def post(number: int) -> tuple[float, bool]:
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        # Decoders stop at the end-of-image marker, so trailing bytes only change
+        # the cache key, as in load.py.
+        data = image + f"decimer-layout-{time.time_ns()}-{number}".encode()
+        start = time.perf_counter()
+        response = local.session.post(
+            f"{url}/image2smiles/",
+            data=data,
+            params=params,
+            headers={"Content-Type": "application/octet-stream"},
+        )
+        return time.perf_counter() - start, response.status_code == 200
+
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        # Warm-up: with several processes every worker has to see some traffic.
+        list(pool.map(post, range(args.concurrency * 2)))
+        start = time.perf_counter()
+        results = list(pool.map(post, range(args.requests)))
+        elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for latency, _ in results)
+
+    def percentile(fraction: float) -> float:
+        return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))]
+
+    return {
+        "requests": len(results),
+        "errors": sum(1 for _, ok in results if not ok),
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(len(results) / elapsed, 2),
+        "p50_ms": round(percentile(0.50) * 1000, 1),
+        "p95_ms": round(percentile(0.95) * 1000, 1),
+        "p99_ms": round(percentile(0.99) * 1000, 1),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("layouts", nargs="+", help='layouts such as "2x4"')
+    parser.add_argument("--inter-op-threads", type=int, default=1)
+    parser.add_argument(
+        "--affinity", default="none", help='"none", "auto" or an explicit CPU set list'
+    )
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--hand-drawn", action="store_true")
+    parser.add_argument(
+        "--image", type=Path, default=ROOT / "example_usage" / "structure.png"
+    )
+    parser.add_argument("--port", type=int, default=8199)
+    parser.add_argument("--startup-timeout", type=float, default=600)
+    parser.add_argument("--json", type=Path, help="also write the report to this file")
+    args = parser.parse_args()
+
+    url = f"http://127.0.0.1:{args.port}"
+    image = args.image.read_bytes()
+    results = []
+    print(f"CPUs available: {os.cpu_count()}")
+    print(f"{'layout':>8} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} errors")
+    for layout in args.layouts:
+        processes, threads = _parse_layout(layout)
+        server = _start_server(processes, threads, args)
+        try:
+            _wait_until_ready(url, args.startup_timeout)
+            result = {"name": layout, **_run_load(url, image, args)}
+        finally:
+            server.terminate()
+            server.wait()
+        results.append(result)
+        print(
+            f"{layout:>8} {result['requests_per_second']:>8} {result['p50_ms']:>8} "
+            f"{result['p95_ms']:>8} {result['p99_ms']:>8} {result['errors']}"
+        )
+
+    if args.json:
+        settings = {
+            key: str(value) if isinstance(value, Path) else value
+            for key, value in vars(args).items()
+            if key != "json"
+        }
+        write_report(args.json, "layout", settings, results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,20 +9,43 @@ For version history, see: https://github.com/DocMinus/DecimerServerAPI/releases
 Works on Linux and Windows, also Mac with GPU
 """
 
+import abc
+import asyncio
 import base64
 import binascii
+import contextvars
+import cProfile
+import functools
+import hashlib
+import importlib
+import importlib.metadata
+import io
+import json
+import logging
 import os
 import platform
+import random
+import sqlite3
 import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
 
+import numpy as np
 import tensorflow as tf
 import uvicorn
-from DECIMER.decimer import *
 from decimer_image_classifier import DecimerImageClassifier
 from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from PIL import Image, ImageDraw, UnidentifiedImageError
+from starlette.background import BackgroundTask
+from starlette.datastructures import UploadFile
 
-decimer_classifier = DecimerImageClassifier()
+# Models are loaded by the inference backend (see _InferenceBackend) in the
+# background after the server starts listening; until then /health/ready reports 503.
 
 
 def _get_classifier_threshold() -> float:
@@ -57,6 +80,36 @@ def _get_max_payload_size() -> int:
      return limit if limit > 0 else default_limit
 
 
+def _get_int_env(name: str, default: int, minimum: int = 1) -> int:
+    """Returns an integer setting from the environment, falling back to default."""
+
+    configured_value = os.getenv(name)
+    if configured_value is None:
+        return default
+
+    try:
+        value = int(configured_value)
+    except ValueError:
+        return default
+
+    return value if value >= minimum else default
+
+
+def _get_float_env(name: str, default: float, minimum: float = 0.0) -> float:
+    """Returns a float setting from the environment, falling back to default."""
+
+    configured_value = os.getenv(name)
+    if configured_value is None:
+        return default
+
+    try:
+        value = float(configured_value)
+    except ValueError:
+        return default
+
+    return value if value >= minimum else default
+
+
 def _get_accelerator_type() -> str:
     """Detects the available hardware accelerator type.
     
@@ -79,10 +132,809 @@ def _get_accelerator_type() -> str:
     return "cpu"
 
 
+logger = logging.getLogger("decimer_server")
+
 IC_THRESHOLD: float = _get_classifier_threshold()
 # Compatibility alias for previous typo-based variable name.
 IC_TRESHOLD: float = IC_THRESHOLD
 MAX_ENCODED_IMAGE_BYTES: int = _get_max_payload_size()
+# Raw (binary) uploads are capped at the decoded size of the base64 limit.
+MAX_IMAGE_BYTES: int = MAX_ENCODED_IMAGE_BYTES * 3 // 4
+BINARY_CONTENT_TYPES: tuple[str, ...] = ("application/octet-stream", "image/")
+SERVER_FEATURES: list[str] = ["batch", "binary_upload"]
+BATCH_MAX_SIZE: int = _get_int_env("DECIMER_BATCH_MAX_SIZE", 8)
+BATCH_MAX_WAIT_MS: float = _get_float_env("DECIMER_BATCH_MAX_WAIT_MS", 5.0)
+INFERENCE_WORKERS: int = _get_int_env("DECIMER_INFERENCE_WORKERS", 2)
+INFERENCE_QUEUE_SIZE: int = _get_int_env("DECIMER_INFERENCE_QUEUE_SIZE", 64)
+RETRY_AFTER_SECONDS: int = _get_int_env("DECIMER_RETRY_AFTER_SECONDS", 1)
+BATCH_MAX_ITEMS: int = _get_int_env("DECIMER_BATCH_MAX_ITEMS", 256)
+# Upper bound on a whole /image2smiles/batch or /jobs request body, checked
+# against Content-Length and again while the body streams in.
+BATCH_MAX_BODY_BYTES: int = _get_int_env(
+    "DECIMER_BATCH_MAX_BODY_BYTES", 128 * 1024 * 1024
+)
+BATCH_ITEM_CONCURRENCY: int = _get_int_env(
+    "DECIMER_BATCH_ITEM_CONCURRENCY", BATCH_MAX_SIZE
+)
+CACHE_MAX_ENTRIES: int = _get_int_env("DECIMER_CACHE_MAX_ENTRIES", 10000, minimum=0)
+CACHE_TTL_SECONDS: float = _get_float_env("DECIMER_CACHE_TTL_SECONDS", 0.0)
+CACHE_DB_PATH: str | None = os.getenv("DECIMER_CACHE_DB") or None
+# Asynchronous /jobs API: queue and results are kept in this SQLite file, which
+# worker processes may share (unset by default, which turns the API off).
+JOBS_DB_PATH: str | None = os.getenv("DECIMER_JOBS_DB") or None
+JOB_WORKERS: int = _get_int_env(
+    "DECIMER_JOB_WORKERS", BATCH_MAX_SIZE * INFERENCE_WORKERS
+)
+JOB_MAX_ITEMS: int = _get_int_env("DECIMER_JOB_MAX_ITEMS", 100000)
+JOB_LEASE_SECONDS: float = _get_float_env("DECIMER_JOB_LEASE_SECONDS", 600.0)
+JOB_POLL_SECONDS: float = 1.0
+SERVER_TIMING_SAMPLE_RATE: float = _get_float_env(
+    "DECIMER_SERVER_TIMING_SAMPLE_RATE", 0.0
+)
+PROFILE_SAMPLE_RATE: float = _get_float_env("DECIMER_PROFILE_SAMPLE_RATE", 0.0)
+PROFILE_DIR: str = os.getenv("DECIMER_PROFILE_DIR", "profiles")
+# "cprofile" writes one .prof file per sampled request, "tensorflow" a TF profiler
+# trace (viewable in TensorBoard) covering everything the process did meanwhile.
+PROFILER: str = (
+    "tensorflow" if os.getenv("DECIMER_PROFILER", "").lower() == "tensorflow"
+    else "cprofile"
+)
+# Serving layout: N worker processes (each with its own copy of the models), the
+# TensorFlow thread pools of each and, optionally, the CPUs each one is pinned to.
+WORKER_PROCESSES: int = _get_int_env("DECIMER_WORKER_PROCESSES", 1)
+TF_INTRA_OP_THREADS: int = _get_int_env("DECIMER_TF_INTRA_OP_THREADS", 0, minimum=0)
+TF_INTER_OP_THREADS: int = _get_int_env("DECIMER_TF_INTER_OP_THREADS", 0, minimum=0)
+CPU_AFFINITY: str = os.getenv("DECIMER_CPU_AFFINITY", "").strip()
+# Inference backend: "tensorflow" (Keras classifier and DECIMER SavedModels),
+# "tflite" (quantized TFLite classifier, DECIMER on TensorFlow) or "stub"
+# (no models, deterministic answers after a configurable delay, for load tests).
+INFERENCE_BACKEND: str = os.getenv("DECIMER_BACKEND", "tensorflow").strip().lower()
+TFLITE_MODEL_PATH: str = os.getenv("DECIMER_TFLITE_MODEL") or os.path.join(
+    os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "decimer_server",
+    "decimer_classifier.tflite",
+)
+STUB_LATENCY_MS: float = _get_float_env("DECIMER_STUB_LATENCY_MS", 50.0)
+# Opt-in pre-shrink of large scans before the classifier's LANCZOS resize: faster,
+# but shifts the scores slightly. Unset resizes exactly like the original model code.
+CLASSIFIER_REDUCING_GAP: float | None = (
+    _get_float_env("DECIMER_CLASSIFIER_REDUCING_GAP", 0.0, minimum=1.0) or None
+)
+# Heuristic pre-classifier for blank crops, tiny icons, text strips and photos:
+# "observe" only counts what it would reject, "reject" answers such images with
+# reason "prefilter_rejected" without running the classifier, "off" skips it.
+PREFILTER_MODE: str = os.getenv("DECIMER_PREFILTER", "observe").strip().lower()
+if PREFILTER_MODE not in ("off", "observe", "reject"):
+    PREFILTER_MODE = "observe"
+PREFILTER_MIN_SIDE: int = _get_int_env("DECIMER_PREFILTER_MIN_SIDE", 24)
+PREFILTER_MAX_ASPECT_RATIO: float = _get_float_env(
+    "DECIMER_PREFILTER_MAX_ASPECT_RATIO", 15.0, minimum=1.0
+)
+PREFILTER_MIN_INK: float = _get_float_env("DECIMER_PREFILTER_MIN_INK", 0.002)
+PREFILTER_MAX_ENTROPY: float = _get_float_env("DECIMER_PREFILTER_MAX_ENTROPY", 7.0)
+STUB_CLASSIFIER_LATENCY_MS: float = _get_float_env(
+    "DECIMER_STUB_CLASSIFIER_LATENCY_MS", 5.0
+)
+# Priority lanes: requests name theirs in an X-Priority header or "priority" field.
+# The micro-batchers serve "interactive" before "bulk" ("strict"), or take one bulk
+# item after every DECIMER_PRIORITY_WEIGHT interactive ones ("weighted").
+PRIORITY_LANES: tuple[str, ...] = ("interactive", "bulk")
+DEFAULT_PRIORITY: str = os.getenv("DECIMER_DEFAULT_PRIORITY", "interactive").strip().lower()
+if DEFAULT_PRIORITY not in PRIORITY_LANES:
+    DEFAULT_PRIORITY = "interactive"
+PRIORITY_SCHEDULING: str = (
+    "strict" if os.getenv("DECIMER_PRIORITY_SCHEDULING", "").lower() == "strict"
+    else "weighted"
+)
+PRIORITY_WEIGHT: int = _get_int_env("DECIMER_PRIORITY_WEIGHT", 4)
+# Requests one client (X-Client-Id header, else its address) may have in flight; 0 = no cap.
+CLIENT_MAX_IN_FLIGHT: int = _get_int_env("DECIMER_CLIENT_MAX_IN_FLIGHT", 0, minimum=0)
+# Places of DECIMER_INFERENCE_QUEUE_SIZE that bulk requests cannot take, so that
+# interactive requests are still admitted while bulk traffic fills the queue.
+INTERACTIVE_RESERVED: int = min(
+    _get_int_env(
+        "DECIMER_INTERACTIVE_RESERVED", max(1, INFERENCE_QUEUE_SIZE // 4), minimum=0
+    ),
+    INFERENCE_QUEUE_SIZE - 1,
+)
+
+
+def _parse_cpu_list(spec: str) -> set[int]:
+    """Parses a CPU list such as "0-3,8" into a set of CPU ids."""
+
+    cpus = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if part:
+            first, _, last = part.partition("-")
+            cpus.update(range(int(first), int(last or first) + 1))
+    return cpus
+
+
+def _get_cpu_sets() -> list[set[int]]:
+    """Returns the CPU set for each worker slot as configured by DECIMER_CPU_AFFINITY.
+
+    "auto" splits the available CPUs into consecutive blocks of
+    DECIMER_TF_INTRA_OP_THREADS CPUs (or an equal share per worker); otherwise
+    the value lists one CPU set per worker, separated by semicolons ("0-3;4-7").
+    """
+
+    if CPU_AFFINITY.lower() == "auto":
+        cpus = sorted(os.sched_getaffinity(0))
+        size = TF_INTRA_OP_THREADS or max(1, len(cpus) // WORKER_PROCESSES)
+        return [
+            set(cpus[start : start + size])
+            for start in range(0, len(cpus) - size + 1, size)
+        ]
+    return [_parse_cpu_list(spec) for spec in CPU_AFFINITY.split(";") if spec.strip()]
+
+
+worker_info: dict = {
+    "pid": os.getpid(),
+    "slot": 0,
+    "cpu_affinity": None,
+    "intra_op_threads": 0,
+    "inter_op_threads": 0,
+}
+_worker_slot_lock = None
+
+
+def _claim_worker_slot() -> int:
+    """Claims the lowest free worker index among the processes of this server.
+
+    The lock is held for the life of the process, so a worker restarted by
+    uvicorn takes over the index (and CPU set) of the one it replaces. The lock
+    file is removed again by _release_worker_slot on shutdown.
+    """
+
+    global _worker_slot_lock
+    if WORKER_PROCESSES == 1:
+        return 0
+
+    import fcntl
+
+    for slot in range(WORKER_PROCESSES):
+        lock_path = os.path.join(
+            tempfile.gettempdir(), f"decimer-worker-{os.getppid()}-{slot}.lock"
+        )
+        while True:
+            handle = open(lock_path, "w")
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                handle.close()
+                break
+            try:
+                current = os.path.samestat(
+                    os.fstat(handle.fileno()), os.stat(lock_path)
+                )
+            except FileNotFoundError:
+                current = False
+            if current:
+                _worker_slot_lock = handle
+                return slot
+            # A worker shutting down removed the file after we opened it; the
+            # lock on the removed file guards nothing, so lock the new one.
+            handle.close()
+    return os.getpid() % WORKER_PROCESSES
+
+
+def _release_worker_slot() -> None:
+    """Removes the lock file of the worker slot claimed by this process."""
+
+    global _worker_slot_lock
+    if _worker_slot_lock is None:
+        return
+    # Unlink while still holding the lock, see _claim_worker_slot.
+    try:
+        os.unlink(_worker_slot_lock.name)
+    except OSError:
+        pass
+    _worker_slot_lock.close()
+    _worker_slot_lock = None
+
+
+def _configure_worker() -> None:
+    """Applies the TensorFlow thread-pool sizes and CPU affinity of this process.
+
+    Must run before the models are loaded, i.e. before TensorFlow creates its
+    thread pools. Settings that cannot be applied are skipped; the values in
+    effect are reported by /system/status.
+    """
+
+    try:
+        if TF_INTRA_OP_THREADS:
+            tf.config.threading.set_intra_op_parallelism_threads(TF_INTRA_OP_THREADS)
+        if TF_INTER_OP_THREADS:
+            tf.config.threading.set_inter_op_parallelism_threads(TF_INTER_OP_THREADS)
+    except RuntimeError:
+        pass  # TensorFlow was already initialized in this process
+
+    worker_info["pid"] = os.getpid()
+    worker_info["intra_op_threads"] = (
+        tf.config.threading.get_intra_op_parallelism_threads()
+    )
+    worker_info["inter_op_threads"] = (
+        tf.config.threading.get_inter_op_parallelism_threads()
+    )
+    if not CPU_AFFINITY or not hasattr(os, "sched_setaffinity"):
+        return
+
+    try:
+        cpu_sets = _get_cpu_sets()
+        if not cpu_sets:
+            return
+        slot = _claim_worker_slot()
+        cpus = cpu_sets[slot % len(cpu_sets)]
+        # Pin every existing thread; threads started later inherit the mask.
+        for thread_id in os.listdir("/proc/self/task"):
+            os.sched_setaffinity(int(thread_id), cpus)
+    except (OSError, ValueError):
+        return
+    worker_info["slot"] = slot
+    worker_info["cpu_affinity"] = sorted(cpus)
+
+
+# Dedicated pool for blocking TensorFlow/PIL work, so the event loop stays free
+# for health checks and request parsing while inference is running.
+inference_executor = ThreadPoolExecutor(
+    max_workers=INFERENCE_WORKERS, thread_name_prefix="decimer-inference"
+)
+
+
+async def _run_blocking(func, *args, **kwargs):
+    """Runs a blocking callable on the inference executor.
+
+    Calls wait for a free worker in executor_slots rather than in the executor's
+    own FIFO queue, so decoding for an interactive request does not queue behind
+    the work of a bulk batch. Calls made on behalf of a request sampled for
+    cProfile run under its profiler.
+    """
+
+    call = functools.partial(func, *args, **kwargs)
+    trace = _request_trace.get()
+    if trace is not None and trace.profiler is not None:
+        call = functools.partial(trace.profiler.runcall, call)
+    loop = asyncio.get_running_loop()
+    await executor_slots.acquire(_request_lane.get())
+    try:
+        future = inference_executor.submit(call)
+    except BaseException:
+        executor_slots.release()
+        raise
+    # The worker stays busy until the call returns, even if the caller is cancelled.
+    future.add_done_callback(
+        lambda _: loop.call_soon_threadsafe(executor_slots.release)
+    )
+    return await asyncio.wrap_future(future)
+
+
+def _format_labels(labels: tuple[tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in labels) + "}"
+
+
+class _Counter:
+    """Minimal Prometheus counter with labels, safe to use from worker threads."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            values = dict(self._values)
+        return [
+            f"{self.name}{_format_labels(labels)} {value}"
+            for labels, value in sorted(values.items())
+        ]
+
+
+class _Histogram:
+    """Minimal Prometheus histogram with labels and cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, buckets: tuple[float, ...]):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = buckets
+        self._values: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            counts = self._values.setdefault(key, [[0] * len(self.buckets), 0, 0.0])
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[0][index] += 1
+            counts[1] += 1
+            counts[2] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            values = {
+                key: (list(buckets), count, total)
+                for key, (buckets, count, total) in self._values.items()
+            }
+        lines = []
+        for labels, (buckets, count, total) in sorted(values.items()):
+            for bound, bucket_count in zip(self.buckets, buckets):
+                bucket_labels = labels + (("le", repr(float(bound))),)
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(bucket_labels)} {bucket_count}"
+                )
+            inf_labels = labels + (("le", "+Inf"),)
+            lines.append(f"{self.name}_bucket{_format_labels(inf_labels)} {count}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {total}")
+        return lines
+
+
+class _Gauge:
+    """Prometheus gauge whose labelled values are read by a callback at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, read):
+        self.name = name
+        self.documentation = documentation
+        self.read = read
+
+    def samples(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(tuple(sorted(labels.items())))} {value}"
+            for labels, value in self.read()
+        ]
+
+
+STAGE_SECONDS = _Histogram(
+    "decimer_stage_duration_seconds",
+    "Duration of the /image2smiles/ pipeline stages.",
+    (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+PAYLOAD_BYTES = _Histogram(
+    "decimer_payload_bytes",
+    "Size of uploaded images after base64 decoding.",
+    tuple(2**exponent * 1024 for exponent in range(2, 14, 2)),
+)
+BATCH_SIZE = _Histogram(
+    "decimer_batch_size",
+    "Number of items dispatched together by a micro-batcher.",
+    (1, 2, 4, 8, 16, 32, 64),
+)
+RESULTS = _Counter(
+    "decimer_results_total",
+    "Conversion results by reason ('success' when a SMILES was returned).",
+)
+MODEL_REQUESTS = _Counter(
+    "decimer_model_requests_total",
+    "Transformer forward passes by model.",
+)
+COALESCED = _Counter(
+    "decimer_coalesced_requests_total",
+    "Conversions answered by an identical conversion already in flight.",
+)
+QUEUE_WAIT = _Histogram(
+    "decimer_queue_wait_seconds",
+    "Time items waited in a micro-batcher queue, by queue and priority lane.",
+    (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+PREFILTER = _Counter(
+    "decimer_prefilter_total",
+    "Heuristic pre-classifier results by check ('passed' when none fired) and "
+    "outcome ('rejected' or the classifier decision).",
+)
+
+
+class _RequestTrace:
+    """Stage timings of a single request, reported in its Server-Timing header.
+
+    Stages are timed from the event loop, so they include the wait for an
+    executor thread; micro-batcher waits are reported separately as
+    ``<batcher>_queue`` and the batch run itself as ``<batcher>``.
+    """
+
+    def __init__(self, profiler: cProfile.Profile | None = None):
+        self.started = time.perf_counter()
+        self.timings: dict[str, float] = {}
+        self.profiler = profiler
+
+    def record(self, stage: str, seconds: float) -> None:
+        self.timings[stage] = self.timings.get(stage, 0.0) + seconds
+
+    def server_timing(self) -> str:
+        entries = [*self.timings.items(), ("total", time.perf_counter() - self.started)]
+        return ", ".join(
+            f"{stage};dur={seconds * 1000:.2f}" for stage, seconds in entries
+        )
+
+
+_request_trace: contextvars.ContextVar[_RequestTrace | None] = contextvars.ContextVar(
+    "decimer_request_trace", default=None
+)
+# Priority lane of the work done in the current context, see PRIORITY_LANES.
+_request_lane: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "decimer_request_lane", default=DEFAULT_PRIORITY
+)
+# Only one request is profiled at a time; samples drawn meanwhile are skipped.
+_profile_slot = threading.Lock()
+
+
+@contextmanager
+def _in_lane(lane: str):
+    """Runs the block's inference in the given priority lane."""
+
+    token = _request_lane.set(lane)
+    try:
+        yield
+    finally:
+        _request_lane.reset(token)
+
+
+class _PrioritySlots:
+    """Counting semaphore whose waiters are served by priority lane.
+
+    Waiters are woken as PRIORITY_SCHEDULING prescribes for the micro-batchers:
+    interactive first ("strict"), or one bulk waiter after every PRIORITY_WEIGHT
+    interactive ones ("weighted").
+    """
+
+    def __init__(self, slots: int):
+        self.free = slots
+        self._waiters: dict[str, deque] = {lane: deque() for lane in PRIORITY_LANES}
+        self._interactive_streak = 0
+
+    def _prune(self) -> None:
+        """Drops waiters that were cancelled while queued."""
+        for queue in self._waiters.values():
+            while queue and queue[0].done():
+                queue.popleft()
+
+    def _next_waiter(self) -> asyncio.Future | None:
+        self._prune()
+        interactive, bulk = self._waiters["interactive"], self._waiters["bulk"]
+        if interactive and bulk and PRIORITY_SCHEDULING == "weighted":
+            if self._interactive_streak >= PRIORITY_WEIGHT:
+                self._interactive_streak = 0
+                return bulk.popleft()
+            self._interactive_streak += 1
+            return interactive.popleft()
+        if interactive:
+            return interactive.popleft()
+        if bulk:
+            self._interactive_streak = 0
+            return bulk.popleft()
+        return None
+
+    async def acquire(self, lane: str) -> None:
+        self._prune()
+        if self.free and not any(self._waiters.values()):
+            self.free -= 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters[lane].append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just before the cancellation.
+                self.release()
+            raise
+
+    def release(self) -> None:
+        waiter = self._next_waiter()
+        if waiter is None:
+            self.free += 1
+        else:
+            waiter.set_result(None)
+
+
+executor_slots = _PrioritySlots(INFERENCE_WORKERS)
+
+
+@contextmanager
+def _traced(stage: str):
+    """Adds the duration of the block to the current request's trace, if any."""
+
+    trace = _request_trace.get()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if trace is not None:
+            trace.record(stage, time.perf_counter() - start)
+
+
+def _begin_profile() -> tuple[bool, cProfile.Profile | None]:
+    """Starts a profiling session for a sampled request if none is running.
+
+    Returns whether a session was started and, for cProfile, the profiler to use.
+    """
+
+    if not _profile_slot.acquire(blocking=False):
+        return False, None
+    try:
+        if PROFILER == "tensorflow":
+            tf.profiler.experimental.start(PROFILE_DIR)
+            return True, None
+        return True, cProfile.Profile()
+    except Exception:
+        _profile_slot.release()
+        return False, None
+
+
+def _end_profile(profiler: cProfile.Profile | None) -> None:
+    """Stops the profiling session and writes its dump into PROFILE_DIR."""
+
+    try:
+        if profiler is None:
+            tf.profiler.experimental.stop()
+        else:
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            profiler.dump_stats(
+                os.path.join(PROFILE_DIR, f"image2smiles-{time.time_ns()}.prof")
+            )
+    except Exception:
+        pass
+    finally:
+        _profile_slot.release()
+
+
+class _InferenceBackend(abc.ABC):
+    """Loads the models and runs the classifier and DECIMER on prepared inputs.
+
+    The server only talks to the models through this interface; see BACKENDS
+    for the implementations and DECIMER_BACKEND for the selection.
+    """
+
+    name = "base"
+
+    @abc.abstractmethod
+    def load_classifier(self) -> None:
+        """Loads the image classifier (called once at startup, in a worker thread)."""
+
+    @abc.abstractmethod
+    def classifier_scores(self, images: list[np.ndarray]) -> list[float]:
+        """Scores RGB(A) pixel arrays with the image classifier (0 = structure)."""
+
+    @abc.abstractmethod
+    def load_decimer(self) -> None:
+        """Loads the DECIMER models (called once at startup, in a worker thread)."""
+
+    @abc.abstractmethod
+    def preprocess(self, pixels: np.ndarray):
+        """Turns an RGBA pixel array into the input of predict_tokens."""
+
+    @abc.abstractmethod
+    def predict_tokens(self, encoded_image, hand_drawn: bool):
+        """Runs DECIMER_Hand_drawn or DECIMER_V2 on a preprocessed image."""
+
+    @abc.abstractmethod
+    def detokenize(self, predicted_tokens) -> str:
+        """Turns the output of predict_tokens into a SMILES string."""
+
+
+class _TensorFlowBackend(_InferenceBackend):
+    """Keras image classifier and the DECIMER_V2/DECIMER_Hand_drawn SavedModels."""
+
+    name = "tensorflow"
+
+    def __init__(self):
+        self.classifier: DecimerImageClassifier | None = None
+        self.decimer = None  # the DECIMER.decimer module
+
+    def load_classifier(self) -> None:
+        self.classifier = DecimerImageClassifier(reducing_gap=CLASSIFIER_REDUCING_GAP)
+
+    def classifier_scores(self, images: list[np.ndarray]) -> list[float]:
+        return self.classifier.get_classifier_scores(images)
+
+    def load_decimer(self) -> None:
+        # Importing DECIMER downloads (first run) and loads both models.
+        self.decimer = importlib.import_module("DECIMER.decimer")
+
+    def preprocess(self, pixels: np.ndarray):
+        return self.decimer.config.decode_image(pixels)
+
+    def predict_tokens(self, encoded_image, hand_drawn: bool):
+        model = self.decimer.DECIMER_Hand_drawn if hand_drawn else self.decimer.DECIMER_V2
+        predicted_tokens, confidence_values = model(tf.constant(encoded_image))
+        return predicted_tokens
+
+    def detokenize(self, predicted_tokens) -> str:
+        return self.decimer.utils.decoder(
+            self.decimer.detokenize_output(predicted_tokens)
+        )
+
+
+class _TFLiteBackend(_TensorFlowBackend):
+    """Post-training quantized TFLite classifier; DECIMER stays on TensorFlow.
+
+    The TFLite model is converted from the bundled classifier on first start
+    when DECIMER_TFLITE_MODEL does not exist yet.
+    """
+
+    name = "tflite"
+
+    def load_classifier(self) -> None:
+        from decimer_image_classifier.tflite import (
+            DecimerImageClassifierLite,
+            convert_to_tflite,
+        )
+
+        if not os.path.exists(TFLITE_MODEL_PATH):
+            os.makedirs(os.path.dirname(TFLITE_MODEL_PATH) or ".", exist_ok=True)
+            # Written aside and moved into place, so that worker processes
+            # starting together never load a half-written model.
+            partial_path = f"{TFLITE_MODEL_PATH}.partial-{os.getpid()}"
+            convert_to_tflite(partial_path)
+            os.replace(partial_path, TFLITE_MODEL_PATH)
+        self.classifier = DecimerImageClassifierLite(
+            TFLITE_MODEL_PATH,
+            reducing_gap=CLASSIFIER_REDUCING_GAP,
+            num_threads=TF_INTRA_OP_THREADS or None,
+        )
+
+
+class _StubBackend(_InferenceBackend):
+    """Loads no models: every image is a structure and gets a SMILES chosen by
+    a hash of its pixels, after DECIMER_STUB_LATENCY_MS per image (and
+    DECIMER_STUB_CLASSIFIER_LATENCY_MS per classifier batch).
+    """
+
+    name = "stub"
+    SMILES = ("c1ccccc1", "CCO", "CC(=O)O", "C1CCCCC1", "c1ccncc1", "CC(C)O")
+
+    def load_classifier(self) -> None:
+        pass
+
+    def classifier_scores(self, images: list[np.ndarray]) -> list[float]:
+        time.sleep(STUB_CLASSIFIER_LATENCY_MS / 1000)
+        return [0.0 for _ in images]
+
+    def load_decimer(self) -> None:
+        pass
+
+    def preprocess(self, pixels: np.ndarray):
+        return pixels
+
+    def predict_tokens(self, encoded_image, hand_drawn: bool):
+        time.sleep(STUB_LATENCY_MS / 1000)
+        digest = hashlib.sha256(np.ascontiguousarray(encoded_image).tobytes()).digest()
+        return self.SMILES[digest[0] % len(self.SMILES)]
+
+    def detokenize(self, predicted_tokens) -> str:
+        return predicted_tokens
+
+
+BACKENDS: dict[str, type[_InferenceBackend]] = {
+    "tensorflow": _TensorFlowBackend,
+    "tflite": _TFLiteBackend,
+    "stub": _StubBackend,
+}
+if INFERENCE_BACKEND not in BACKENDS:
+    raise ValueError(
+        f"Unknown DECIMER_BACKEND {INFERENCE_BACKEND!r}; "
+        f"expected one of: {', '.join(BACKENDS)}."
+    )
+backend: _InferenceBackend = BACKENDS[INFERENCE_BACKEND]()
+
+
+def _decode_pixels(image_bytes: bytes) -> tuple[np.ndarray, np.ndarray]:
+    """Decodes uploaded image bytes once into an RGBA pixel array.
+
+    Mirrors the loader in DECIMER.config (RGBA conversion, HEIF fallback), so
+    the array can be handed to the prefilter and config.decode_image without
+    touching the filesystem. The classifier flattens transparency onto white
+    for RGBA images only and otherwise ignores it, as convert("L") does; a
+    palette GIF with a transparent colour is therefore passed to it without
+    the alpha channel, so it scores as it did from a file.
+
+    Args:
+        image_bytes (bytes): raw image file content
+
+    Returns:
+        tuple: uint8 array of shape (height, width, 4), and the same pixels as
+        the classifier should see them (RGBA, or RGB without the alpha channel)
+    """
+
+    try:
+        image = Image.open(io.BytesIO(image_bytes))
+    except UnidentifiedImageError:
+        from pillow_heif import register_heif_opener
+
+        register_heif_opener()
+        image = Image.open(io.BytesIO(image_bytes))
+
+    pixels = np.asarray(image.convert("RGBA"))
+    if image.mode != "RGBA" and (
+        image.mode in ("LA", "PA") or "transparency" in image.info
+    ):
+        return pixels, pixels[..., :3]
+    return pixels, pixels
+
+
+def _decode_pixels_timed(image_bytes: bytes) -> tuple[np.ndarray, np.ndarray]:
+    with STAGE_SECONDS.time(stage="image_decode"):
+        return _decode_pixels(image_bytes)
+
+
+def _prefilter_check(pixels: np.ndarray) -> str | None:
+    """Names the first heuristic that marks an image as trivially not a structure.
+
+    Checks the dimensions, then the share of ink (pixels clearly differing from
+    the dominant background level) and the entropy of the gray-level histogram
+    on a strided sample of at most about 128 x 128 pixels.
+
+    Args:
+        pixels (np.ndarray): uint8 RGBA array as returned by _decode_pixels
+
+    Returns:
+        str | None: "too_small", "aspect_ratio", "low_ink", "high_entropy" or
+        None when the image should go to the classifier
+    """
+
+    height, width = pixels.shape[:2]
+    if min(height, width) < PREFILTER_MIN_SIDE:
+        return "too_small"
+    if max(height, width) / min(height, width) > PREFILTER_MAX_ASPECT_RATIO:
+        return "aspect_ratio"
+
+    step = -(-max(height, width) // 128)  # ceil, so the sample side is <= 128
+    sample = pixels[::step, ::step]
+    # Integer luma (weights sum to 256, so uint16 cannot overflow), with
+    # transparent areas flattened onto white.
+    luma = (
+        77 * sample[..., 0].astype(np.uint16)
+        + 150 * sample[..., 1].astype(np.uint16)
+        + 29 * sample[..., 2].astype(np.uint16)
+    ) >> 8
+    alpha = sample[..., 3]
+    if alpha.min() < 255:
+        alpha = alpha.astype(np.uint16)
+        luma = (luma * alpha + 255 * (255 - alpha)) // 255
+    histogram = np.bincount(luma.ravel(), minlength=256)
+    pixel_count = luma.size
+
+    background = int(np.argmax(histogram))
+    ink_levels = np.abs(np.arange(256) - background) > 48
+    if histogram[ink_levels].sum() / pixel_count < PREFILTER_MIN_INK:
+        return "low_ink"
+
+    probabilities = histogram[histogram > 0] / pixel_count
+    if -(probabilities * np.log2(probabilities)).sum() > PREFILTER_MAX_ENTROPY:
+        return "high_entropy"
+    return None
+
+
+def _decode_for_decimer(pixels: np.ndarray):
+    with STAGE_SECONDS.time(stage="decimer_preprocess"):
+        return backend.preprocess(pixels)
+
+
+def _score_classifier_batch(images: list) -> list[float]:
+    with STAGE_SECONDS.time(stage="classifier"):
+        return backend.classifier_scores(images)
 
 
 def _predict_smiles(encoded_image: any, hand_drawn: bool = False) -> str | None:
@@ -97,17 +949,1019 @@ def _predict_smiles(encoded_image: any, hand_drawn: bool = False) -> str | None:
         str | None: smiles representation of the molecule in the input image, or None if prediction fails
     """
 
-    model = DECIMER_Hand_drawn if hand_drawn else DECIMER_V2
-    predicted_tokens, confidence_values = model(tf.constant(encoded_image))
-    try:
-        predicted_smiles = utils.decoder(detokenize_output(predicted_tokens))
-    except:
-        return None
+    model_name = "DECIMER_Hand_drawn" if hand_drawn else "DECIMER_V2"
+    MODEL_REQUESTS.inc(model=model_name)
+    with STAGE_SECONDS.time(stage="transformer"):
+        predicted_tokens = backend.predict_tokens(encoded_image, hand_drawn)
+    try:
+        with STAGE_SECONDS.time(stage="detokenize"):
+            predicted_smiles = backend.detokenize(predicted_tokens)
+    except:
+        return None
+
+    return predicted_smiles
+
+
+def _predict_smiles_batch(
+    encoded_images: list, hand_drawn: bool = False
+) -> list[str | BaseException | None]:
+    """Predicts smiles for a group of images that share the same model.
+
+    The exported DECIMER SavedModels trace a single-image signature (the batch
+    dimension is added inside the graph), so the images would only run one
+    after another; smiles_batcher therefore dispatches one image at a time.
+    Failures are returned per item so one bad image does not fail the others.
+
+    Args:
+        encoded_images (list): decoded images as returned by config.decode_image
+        hand_drawn (bool): Flag to select the hand-drawn model
+
+    Returns:
+        list: smiles, None or the raised exception for every input image, in order
+    """
+
+    results = []
+    for encoded_image in encoded_images:
+        try:
+            results.append(_predict_smiles(encoded_image, hand_drawn))
+        except Exception as exc:
+            results.append(exc)
+    return results
+
+
+class _MicroBatcher:
+    """Groups concurrent inference calls into per-model batches.
+
+    The first queued item opens a collection window of ``max_wait_ms``; the
+    window closes early once ``max_batch_size`` items are waiting. Items are
+    then grouped by key (the model to use), each group is handed to
+    ``run_batch`` on the inference executor and every caller receives its own
+    result. At most ``max_concurrency`` batches run at the same time; while all
+    slots are busy new items keep accumulating for the next batch.
+
+    Items wait in one queue per priority lane (the caller's ``_request_lane``)
+    and are taken as PRIORITY_SCHEDULING prescribes.
+    """
+
+    def __init__(
+        self,
+        run_batch,
+        max_batch_size: int,
+        max_wait_ms: float,
+        max_concurrency: int = 1,
+        name: str = "batch",
+    ):
+        self.name = name
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.max_concurrency = max_concurrency
+        self._lanes: dict[str, deque] = {lane: deque() for lane in PRIORITY_LANES}
+        self._queued: asyncio.Event | None = None
+        # Interactive items taken since the last bulk item ("weighted" scheduling).
+        self._interactive_streak = 0
+        self._slots: asyncio.Semaphore | None = None
+        self._task: asyncio.Task | None = None
+        self._dispatches: set[asyncio.Task] = set()
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(len(queue) for queue in self._lanes.values())
+
+    def lane_depths(self) -> dict[str, int]:
+        return {lane: len(queue) for lane, queue in self._lanes.items()}
+
+    def start(self) -> None:
+        self._queued = asyncio.Event()
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self._task = asyncio.create_task(self._collect())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for dispatch in list(self._dispatches):
+            dispatch.cancel()
+
+    async def submit(self, key, item):
+        """Queues one item and waits for its individual result."""
+
+        future = asyncio.get_running_loop().create_future()
+        lane = _request_lane.get()
+        queued = (_request_trace.get(), time.perf_counter(), lane)
+        self._lanes[lane].append((key, item, future, queued))
+        self._queued.set()
+        return await future
+
+    def _take(self):
+        """Removes the next item by priority; None when every lane is empty."""
+
+        interactive, bulk = self._lanes["interactive"], self._lanes["bulk"]
+        if interactive and bulk and PRIORITY_SCHEDULING == "weighted":
+            if self._interactive_streak >= PRIORITY_WEIGHT:
+                self._interactive_streak = 0
+                return bulk.popleft()
+            self._interactive_streak += 1
+            return interactive.popleft()
+        if interactive:
+            return interactive.popleft()
+        if bulk:
+            self._interactive_streak = 0
+            return bulk.popleft()
+        return None
+
+    async def _get(self, timeout: float | None = None):
+        """Waits for the next item; raises asyncio.TimeoutError after ``timeout`` seconds."""
+
+        while True:
+            entry = self._take()
+            if entry is not None:
+                return entry
+            self._queued.clear()
+            await asyncio.wait_for(self._queued.wait(), timeout)
+
+    async def _collect(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            # Batches are formed once a slot is free, so that items queued
+            # meanwhile are picked by priority, not by arrival.
+            await self._slots.acquire()
+            pending = [await self._get()]
+            deadline = loop.time() + self.max_wait_ms / 1000
+            while len(pending) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    pending.append(await self._get(timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            groups: dict = {}
+            for key, item, future, queued in pending:
+                groups.setdefault(key, []).append((item, future, queued))
+
+            for number, (key, entries) in enumerate(groups.items()):
+                if number:
+                    await self._slots.acquire()
+                dispatch = asyncio.create_task(self._dispatch(key, entries))
+                self._dispatches.add(dispatch)
+                dispatch.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self, key, entries: list) -> None:
+        items = [item for item, _, _ in entries]
+        BATCH_SIZE.observe(len(items), batcher=self.name)
+        traced = [queued for _, _, queued in entries if queued[0] is not None]
+        profiled = [trace for trace, _, _ in traced if trace.profiler is not None]
+        if profiled:
+            # Profile the whole batch for the (first) sampled request in it.
+            _request_trace.set(profiled[0])
+        # The batch runs in the most urgent lane of its items.
+        lanes = {lane for _, _, (_, _, lane) in entries}
+        _request_lane.set(next(lane for lane in PRIORITY_LANES if lane in lanes))
+        started = time.perf_counter()
+        try:
+            results = await _run_blocking(self.run_batch, key, items)
+        except Exception as exc:
+            results = [exc] * len(entries)
+        finally:
+            self._slots.release()
+
+        finished = time.perf_counter()
+        for _, _, (_, queued_at, lane) in entries:
+            QUEUE_WAIT.observe(started - queued_at, queue=self.name, lane=lane)
+        for trace, queued_at, _ in traced:
+            trace.record(f"{self.name}_queue", started - queued_at)
+            trace.record(self.name, finished - started)
+
+        for (_, future, _), result in zip(entries, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+SERVER_STARTED_AT: float = time.time()
+model_status: dict[str, dict] = {
+    name: {
+        "state": "pending",
+        "load_seconds": None,
+        "warmup_seconds": None,
+        "error": None,
+    }
+    for name in ("classifier", "DECIMER_V2", "DECIMER_Hand_drawn")
+}
+
+
+def _models_ready() -> bool:
+    return all(status["state"] == "ready" for status in model_status.values())
+
+
+def _warmup_image() -> np.ndarray:
+    """Draws a small benzene-like ring as a representative warm-up input."""
+
+    image = Image.new("RGB", (256, 256), "white")
+    ring = [
+        (128 + 60 * np.cos(angle), 128 + 60 * np.sin(angle))
+        for angle in np.linspace(0, 2 * np.pi, 7)
+    ]
+    ImageDraw.Draw(image).line(ring, fill="black", width=4)
+    return np.asarray(image.convert("RGBA"))
+
+
+def _load_classifier() -> None:
+    """Loads the image classifier and scores the warm-up image via the array path."""
+
+    status = model_status["classifier"]
+    status["state"] = "loading"
+    start = time.perf_counter()
+    backend.load_classifier()
+    status["load_seconds"] = round(time.perf_counter() - start, 3)
+
+    status["state"] = "warming_up"
+    start = time.perf_counter()
+    backend.classifier_scores([_warmup_image()])
+    status["warmup_seconds"] = round(time.perf_counter() - start, 3)
+    status["state"] = "ready"
+
+
+def _load_decimer() -> None:
+    """Loads DECIMER (downloads both models on first run) and warms up each model."""
+
+    names = ("DECIMER_V2", "DECIMER_Hand_drawn")
+    for name in names:
+        model_status[name]["state"] = "loading"
+    start = time.perf_counter()
+    backend.load_decimer()
+    load_seconds = round(time.perf_counter() - start, 3)
+
+    decoded_image = backend.preprocess(_warmup_image())
+    for name, hand_drawn in zip(names, (False, True)):
+        status = model_status[name]
+        status["load_seconds"] = load_seconds
+        status["state"] = "warming_up"
+        start = time.perf_counter()
+        _predict_smiles(decoded_image, hand_drawn)
+        status["warmup_seconds"] = round(time.perf_counter() - start, 3)
+        status["state"] = "ready"
+
+
+async def _load_models() -> None:
+    """Loads classifier and DECIMER concurrently; failures are kept in model_status."""
+
+    async def run(loader, names: tuple[str, ...]) -> None:
+        try:
+            await asyncio.to_thread(loader)
+        except Exception as exc:
+            for name in names:
+                if model_status[name]["state"] != "ready":
+                    model_status[name]["state"] = "failed"
+                    model_status[name]["error"] = f"{type(exc).__name__}: {exc}"
+
+    await asyncio.gather(
+        run(_load_classifier, ("classifier",)),
+        run(_load_decimer, ("DECIMER_V2", "DECIMER_Hand_drawn")),
+    )
+
+
+def _require_ready() -> None:
+    if not _models_ready():
+        raise HTTPException(
+            status_code=503,
+            detail="Models are not ready yet. Check /health/ready.",
+            headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+        )
+
+
+# DECIMER takes one image per call: grouping images would run them back to back
+# on one thread. Every image gets its own inference slot instead, and the
+# batcher only contributes the priority lanes and queue metrics.
+smiles_batcher = _MicroBatcher(
+    lambda hand_drawn, images: _predict_smiles_batch(images, hand_drawn),
+    max_batch_size=1,
+    max_wait_ms=0,
+    max_concurrency=INFERENCE_WORKERS,
+    name="decimer",
+)
+# The classifier accepts stacked inputs, so its batches run as one forward pass.
+classifier_batcher = _MicroBatcher(
+    lambda _, images: _score_classifier_batch(images),
+    max_batch_size=BATCH_MAX_SIZE,
+    max_wait_ms=BATCH_MAX_WAIT_MS,
+    max_concurrency=INFERENCE_WORKERS,
+    name="classifier",
+)
+
+
+class _AdmissionGate:
+    """Bounds the number of requests admitted to the inference pipeline.
+
+    Admission is non-blocking: when ``capacity`` requests are already in flight
+    further requests are rejected immediately with 503 and a Retry-After hint
+    instead of queueing up unbounded latency. Bulk requests are rejected once
+    only ``reserved`` places are left, which stay free for interactive ones.
+    With ``client_capacity`` set, a single client holding that many places is
+    answered 429 instead, so that one bulk client cannot take the whole queue.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        retry_after: int,
+        client_capacity: int = 0,
+        reserved: int = 0,
+    ):
+        self.capacity = capacity
+        self.retry_after = retry_after
+        self.client_capacity = client_capacity
+        self.reserved = reserved
+        self.in_flight = 0
+        self.in_flight_by_client: dict[str, int] = {}
+
+    def lane_capacity(self, lane: str) -> int:
+        """Returns the number of places requests of ``lane`` may fill."""
+        return self.capacity if lane == "interactive" else self.capacity - self.reserved
+
+    def acquire(
+        self, slots: int = 1, client: str | None = None, lane: str = DEFAULT_PRIORITY
+    ):
+        """Reserves ``slots`` places or raises 503/429; returns an idempotent release."""
+
+        if client is not None and self.client_capacity:
+            if self.in_flight_by_client.get(client, 0) + slots > self.client_capacity:
+                raise HTTPException(
+                    status_code=429,
+                    detail="Too many concurrent requests from this client. Retry later.",
+                    headers={"Retry-After": str(self.retry_after)},
+                )
+        else:
+            client = None
+        if self.in_flight + slots > self.lane_capacity(lane):
+            raise HTTPException(
+                status_code=503,
+                detail="Server is busy, inference queue is full. Retry later.",
+                headers={"Retry-After": str(self.retry_after)},
+            )
+        self.in_flight += slots
+        if client is not None:
+            self.in_flight_by_client[client] = (
+                self.in_flight_by_client.get(client, 0) + slots
+            )
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if not released:
+                released = True
+                self.in_flight -= slots
+                if client is not None:
+                    self.in_flight_by_client[client] -= slots
+                    if not self.in_flight_by_client[client]:
+                        del self.in_flight_by_client[client]
+
+        return release
+
+    @asynccontextmanager
+    async def admit(
+        self, slots: int = 1, client: str | None = None, lane: str = DEFAULT_PRIORITY
+    ):
+        release = self.acquire(slots, client, lane)
+        try:
+            yield
+        finally:
+            release()
+
+
+admission_gate = _AdmissionGate(
+    INFERENCE_QUEUE_SIZE,
+    RETRY_AFTER_SECONDS,
+    CLIENT_MAX_IN_FLIGHT,
+    INTERACTIVE_RESERVED,
+)
+
+METRICS = (
+    STAGE_SECONDS,
+    PAYLOAD_BYTES,
+    BATCH_SIZE,
+    QUEUE_WAIT,
+    RESULTS,
+    MODEL_REQUESTS,
+    COALESCED,
+    PREFILTER,
+    _Gauge(
+        "decimer_in_flight_requests",
+        "Requests currently admitted to the inference pipeline.",
+        lambda: [({}, admission_gate.in_flight)],
+    ),
+    _Gauge(
+        "decimer_queue_depth",
+        "Items waiting in a micro-batcher queue, by priority lane.",
+        lambda: [
+            ({"queue": batcher.name, "lane": lane}, depth)
+            for batcher in (classifier_batcher, smiles_batcher)
+            for lane, depth in batcher.lane_depths().items()
+        ],
+    ),
+    _Gauge(
+        "decimer_job_items_in_progress",
+        "Job items this process is converting.",
+        lambda: [({}, job_queue.in_progress)],
+    ),
+)
+
+
+def _render_metrics() -> str:
+    lines = []
+    for metric in METRICS:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.samples())
+    return "\n".join(lines) + "\n"
+
+
+def _model_version() -> str:
+    """Returns the installed DECIMER version, which fixes the model weights."""
+
+    try:
+        return importlib.metadata.version("decimer")
+    except importlib.metadata.PackageNotFoundError:
+        return "unknown"
+
+
+# Server-wide inputs of every result. They are part of each cache key, so the
+# persistent tier, which outlives the process and may be shared, never serves
+# results computed by another backend, model version, prefilter or classifier
+# preprocessing setting.
+CACHE_KEY_SETTINGS: str = ":".join(
+    str(setting)
+    for setting in (
+        backend.name,
+        _model_version(),
+        PREFILTER_MODE,
+        PREFILTER_MIN_SIDE,
+        PREFILTER_MAX_ASPECT_RATIO,
+        PREFILTER_MIN_INK,
+        PREFILTER_MAX_ENTROPY,
+        CLASSIFIER_REDUCING_GAP,
+    )
+)
+
+
+def _cache_key(
+    decoded_bytes: bytes, is_hand_drawn: bool, classify_image: bool
+) -> str:
+    """Content address of a conversion: image hash plus all result-changing inputs."""
+
+    digest = hashlib.sha256(decoded_bytes).hexdigest()
+    return (
+        f"{digest}:{int(is_hand_drawn)}:{int(classify_image)}:{IC_THRESHOLD}:"
+        f"{CACHE_KEY_SETTINGS}"
+    )
+
+
+class _ResultCache:
+    """Two-tier cache of /image2smiles/ responses keyed by _cache_key.
+
+    The memory tier is an LRU bounded by ``max_entries``; the optional SQLite
+    tier at ``db_path`` survives restarts and refills the memory tier on hits.
+    Entries older than ``ttl_seconds`` are ignored in both tiers (0 = no expiry).
+    The SQLite tier is best effort: when it cannot be opened the cache runs in
+    memory only, and a failed read or write (e.g. a lock held too long by another
+    worker process) is logged and treated as a miss or skipped.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, db_path: str | None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._db: sqlite3.Connection | None = None
+        self._db_lock = threading.Lock()
+        if db_path is not None:
+            try:
+                self._open(db_path)
+            except sqlite3.Error as exc:
+                logger.warning(
+                    "Persistent cache disabled, cannot use %s: %s", db_path, exc
+                )
+                if self._db is not None:
+                    self._db.close()
+                    self._db = None
+
+    def _open(self, db_path: str) -> None:
+        # WAL lets worker processes sharing the file read while one writes;
+        # writers wait at most 2 s for the lock (busy timeout) before giving up.
+        self._db = sqlite3.connect(db_path, check_same_thread=False, timeout=2)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results "
+            "(key TEXT PRIMARY KEY, response TEXT NOT NULL, created REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    async def _db_call(self, func, *args, default=None):
+        """Runs a SQLite tier operation off the event loop; failures are logged."""
+        try:
+            return await asyncio.to_thread(func, *args)
+        except sqlite3.Error as exc:
+            logger.warning("Persistent cache %s failed: %s", func.__name__, exc)
+            return default
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 or self._db is not None
+
+    def _is_fresh(self, created: float) -> bool:
+        return self.ttl_seconds <= 0 or time.time() - created <= self.ttl_seconds
+
+    def _remember(self, key: str, created: float, response: dict) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (created, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _db_get(self, key: str) -> tuple[float, dict] | None:
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT created, response FROM results WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    def _db_put(self, key: str, created: float, response: dict) -> None:
+        with self._db_lock, self._db:  # commits, or rolls back on errors
+            self._db.execute(
+                "INSERT OR REPLACE INTO results (key, response, created) "
+                "VALUES (?, ?, ?)",
+                (key, json.dumps(response), created),
+            )
+
+    def _db_count(self) -> int:
+        with self._db_lock:
+            return self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def _db_clear(self) -> None:
+        with self._db_lock, self._db:
+            self._db.execute("DELETE FROM results")
+
+    async def get(self, key: str) -> dict | None:
+        entry = self._entries.get(key)
+        if entry is not None and self._is_fresh(entry[0]):
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        if entry is not None:
+            del self._entries[key]
+
+        if self._db is not None:
+            entry = await self._db_call(self._db_get, key)
+            if entry is not None and self._is_fresh(entry[0]):
+                self._remember(key, *entry)
+                self.hits += 1
+                return entry[1]
+
+        self.misses += 1
+        return None
+
+    async def put(self, key: str, response: dict) -> None:
+        created = time.time()
+        self._remember(key, created, response)
+        if self._db is not None:
+            await self._db_call(self._db_put, key, created, response)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+        if self._db is not None:
+            await self._db_call(self._db_clear)
+
+    async def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "memory_entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "persistent": self._db is not None,
+            "persistent_entries": (
+                await self._db_call(self._db_count, default=0)
+                if self._db is not None
+                else 0
+            ),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def close(self) -> None:
+        if self._db is not None:
+            with self._db_lock:
+                self._db.close()
+            self._db = None
+
+
+result_cache = _ResultCache(CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS, CACHE_DB_PATH)
+# Conversions currently running, by _cache_key, so identical requests share them.
+in_flight_conversions: dict[str, asyncio.Task] = {}
+
+
+class _JobQueue:
+    """Persistent queue of /jobs conversions, drained by background workers.
+
+    Jobs and their items are stored in SQLite at ``db_path``, so queued work and
+    finished results survive restarts. Up to ``workers`` items are converted at
+    a time; they are claimed in a write transaction, so several server processes
+    can share one database. Items left running by a process that died are queued
+    again when their claim is older than ``lease_seconds`` (right away on start
+    with a single server process).
+    """
+
+    def __init__(self, db_path: str | None, workers: int, lease_seconds: float):
+        self.db_path = db_path
+        self.workers = workers
+        self.lease_seconds = lease_seconds
+        self.in_progress = 0
+        self._db: sqlite3.Connection | None = None
+        self._db_lock = threading.Lock()
+        self._wakeup: asyncio.Event | None = None
+        self._runner: asyncio.Task | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._db is not None
+
+    def _open(self) -> None:
+        # Autocommit mode; writes use explicit BEGIN IMMEDIATE transactions.
+        self._db = sqlite3.connect(
+            self.db_path, check_same_thread=False, timeout=30, isolation_level=None
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                created REAL NOT NULL,
+                cancelled INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS job_items (
+                job_id TEXT NOT NULL,
+                idx INTEGER NOT NULL,
+                name TEXT,
+                state TEXT NOT NULL,
+                image BLOB,
+                is_hand_drawn INTEGER NOT NULL,
+                classify_image INTEGER NOT NULL,
+                claimed REAL,
+                result TEXT,
+                failed INTEGER NOT NULL DEFAULT 0,
+                done_seq INTEGER,
+                PRIMARY KEY (job_id, idx)
+            );
+            CREATE TABLE IF NOT EXISTS job_requests (
+                key TEXT PRIMARY KEY,
+                job_id TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS job_items_state ON job_items (state, claimed);
+            CREATE INDEX IF NOT EXISTS job_items_done ON job_items (job_id, done_seq);
+            """
+        )
+
+    @contextmanager
+    def _transaction(self):
+        with self._db_lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._db
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+    @staticmethod
+    def _next_done_seq(db: sqlite3.Connection, job_id: str) -> int:
+        return db.execute(
+            "SELECT COALESCE(MAX(done_seq), 0) + 1 FROM job_items WHERE job_id = ?",
+            (job_id,),
+        ).fetchone()[0]
+
+    def _db_add_items(
+        self, job_id: str, items: list[tuple], create: bool, request_key: str | None
+    ) -> str | None:
+        if request_key is not None:
+            # Keys are scoped to the request target, so a key reused for another
+            # job (or for a new job) is a new request and not a retry.
+            target = "/jobs" if create else f"/jobs/{job_id}/items"
+            request_key = f"{target} {request_key}"
+        with self._transaction() as db:
+            if request_key is not None:
+                row = db.execute(
+                    "SELECT job_id FROM job_requests WHERE key = ?", (request_key,)
+                ).fetchone()
+                if row is not None:
+                    return row[0]  # a retry of a request that was already stored
+            if create:
+                db.execute(
+                    "INSERT INTO jobs (id, created) VALUES (?, ?)", (job_id, time.time())
+                )
+            else:
+                row = db.execute(
+                    "SELECT cancelled FROM jobs WHERE id = ?", (job_id,)
+                ).fetchone()
+                if row is None:
+                    return None
+                if row[0]:
+                    raise HTTPException(
+                        status_code=409, detail="Job has been cancelled."
+                    )
+            start = db.execute(
+                "SELECT COUNT(*) FROM job_items WHERE job_id = ?", (job_id,)
+            ).fetchone()[0]
+            if start + len(items) > JOB_MAX_ITEMS:
+                raise HTTPException(
+                    status_code=413,
+                    detail=(
+                        "Too many items in job. "
+                        f"Maximum allowed number is {JOB_MAX_ITEMS}."
+                    ),
+                )
+            done_seq = self._next_done_seq(db, job_id)
+            rows = []
+            for index, (name, image, is_hand_drawn, classify_image, error) in enumerate(
+                items, start
+            ):
+                if error is None:
+                    rows.append(
+                        (job_id, index, name, "queued", image, is_hand_drawn,
+                         classify_image, None, 0, None)
+                    )
+                else:
+                    # Items that fail validation are finished right away.
+                    rows.append(
+                        (job_id, index, name, "done", None, is_hand_drawn,
+                         classify_image, json.dumps(error), 1, done_seq)
+                    )
+                    done_seq += 1
+            db.executemany(
+                "INSERT INTO job_items (job_id, idx, name, state, image, "
+                "is_hand_drawn, classify_image, result, failed, done_seq) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            if request_key is not None:
+                db.execute(
+                    "INSERT INTO job_requests (key, job_id) VALUES (?, ?)",
+                    (request_key, job_id),
+                )
+        return job_id
+
+    def _db_requeue(self, claimed_before: float) -> None:
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE job_items SET state = 'queued', claimed = NULL "
+                "WHERE state = 'running' AND claimed < ?",
+                (claimed_before,),
+            )
+
+    def _db_claim(self, limit: int) -> list[tuple]:
+        now = time.time()
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE job_items SET state = 'queued', claimed = NULL "
+                "WHERE state = 'running' AND claimed < ?",
+                (now - self.lease_seconds,),
+            )
+            # Queued items are claimed in submission (rowid) order.
+            rows = db.execute(
+                "SELECT rowid, job_id, image, is_hand_drawn, classify_image "
+                "FROM job_items WHERE state = 'queued' AND claimed IS NULL "
+                "ORDER BY rowid LIMIT ?",
+                (limit,),
+            ).fetchall()
+            db.executemany(
+                "UPDATE job_items SET state = 'running', claimed = ? WHERE rowid = ?",
+                [(now, row[0]) for row in rows],
+            )
+        return rows
+
+    def _db_finish(self, rowid: int, job_id: str, result: dict) -> None:
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE job_items SET state = 'done', image = NULL, result = ?, "
+                "failed = ?, done_seq = ? WHERE rowid = ? AND state = 'running'",
+                (
+                    json.dumps(result),
+                    int("message" in result),
+                    self._next_done_seq(db, job_id),
+                    rowid,
+                ),
+            )
+
+    def _db_status(self, job_id: str) -> dict | None:
+        with self._db_lock:
+            job = self._db.execute(
+                "SELECT created, cancelled FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if job is None:
+                return None
+            counts = self._db.execute(
+                "SELECT state, COUNT(*), SUM(failed) FROM job_items "
+                "WHERE job_id = ? GROUP BY state",
+                (job_id,),
+            ).fetchall()
+
+        by_state = {"queued": 0, "running": 0, "done": 0, "cancelled": 0}
+        failed = 0
+        for state, count, state_failed in counts:
+            by_state[state] = count
+            failed += state_failed or 0
+        if job[1]:
+            state = "cancelled"
+        elif by_state["queued"] + by_state["running"] == 0:
+            state = "completed"
+        elif by_state["done"] or by_state["running"]:
+            state = "running"
+        else:
+            state = "queued"
+        return {
+            "job_id": job_id,
+            "state": state,
+            "created": job[0],
+            "items": sum(by_state.values()),
+            **by_state,
+            "failed": failed,
+        }
+
+    def _db_results(self, job_id: str, cursor: int, limit: int) -> list[dict]:
+        with self._db_lock:
+            rows = self._db.execute(
+                "SELECT idx, name, result, done_seq FROM job_items "
+                "WHERE job_id = ? AND done_seq > ? ORDER BY done_seq LIMIT ?",
+                (job_id, cursor, limit),
+            ).fetchall()
+        return [
+            {"index": index, "name": name, **json.loads(result)}
+            for index, name, result, _ in rows
+        ]
+
+    def _db_cancel(self, job_id: str) -> bool:
+        with self._transaction() as db:
+            if not db.execute(
+                "UPDATE jobs SET cancelled = 1 WHERE id = ?", (job_id,)
+            ).rowcount:
+                return False
+            db.execute(
+                "UPDATE job_items SET state = 'cancelled', image = NULL "
+                "WHERE job_id = ? AND state = 'queued'",
+                (job_id,),
+            )
+        return True
+
+    def _db_delete(self, job_id: str) -> bool:
+        with self._transaction() as db:
+            db.execute("DELETE FROM job_items WHERE job_id = ?", (job_id,))
+            db.execute("DELETE FROM job_requests WHERE job_id = ?", (job_id,))
+            return bool(db.execute("DELETE FROM jobs WHERE id = ?", (job_id,)).rowcount)
+
+    async def add_items(
+        self,
+        job_id: str,
+        items: list[tuple],
+        create: bool,
+        request_key: str | None = None,
+    ) -> str | None:
+        """Stores (name, image, is_hand_drawn, classify_image, error) items of a job.
+
+        Returns the id of the job holding the items, or None when an existing job
+        (create=False) is not found. A request_key seen before for the same target
+        (a new job, or the items of this job) stores nothing and returns the job
+        of the first request with that key.
+        """
+
+        stored_in = await asyncio.to_thread(
+            self._db_add_items, job_id, items, create, request_key
+        )
+        self._wakeup.set()
+        return stored_in
+
+    async def status(self, job_id: str) -> dict | None:
+        return await asyncio.to_thread(self._db_status, job_id)
+
+    async def results(self, job_id: str, cursor: int, limit: int) -> list[dict]:
+        return await asyncio.to_thread(self._db_results, job_id, cursor, limit)
+
+    async def cancel(self, job_id: str) -> bool:
+        return await asyncio.to_thread(self._db_cancel, job_id)
+
+    async def delete(self, job_id: str) -> bool:
+        return await asyncio.to_thread(self._db_delete, job_id)
+
+    async def _process(
+        self, rowid: int, job_id: str, image: bytes, is_hand_drawn, classify_image
+    ) -> None:
+        self.in_progress += 1
+        try:
+            try:
+                with _in_lane("bulk"):
+                    result = await _convert_image(
+                        image, bool(is_hand_drawn), bool(classify_image)
+                    )
+            except Exception as exc:
+                result = _error_fields(exc)
+            await asyncio.to_thread(self._db_finish, rowid, job_id, result)
+        finally:
+            self.in_progress -= 1
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        tasks: set[asyncio.Task] = set()
+        try:
+            while True:
+                self._wakeup.clear()
+                free = self.workers - len(tasks)
+                if free > 0 and _models_ready():
+                    for row in await asyncio.to_thread(self._db_claim, free):
+                        task = asyncio.create_task(self._process(*row))
+                        tasks.add(task)
+                        task.add_done_callback(tasks.discard)
+                # Woken by new items and finished conversions; the timeout picks
+                # up items submitted to other processes and the end of loading.
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), JOB_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def start(self) -> None:
+        if self.db_path is None:
+            return
+        try:
+            self._open()
+            if WORKER_PROCESSES == 1:
+                self._db_requeue(claimed_before=time.time())
+        except sqlite3.Error as exc:
+            # The job API is optional: serve everything else without it.
+            logger.warning("Job API disabled, cannot use %s: %s", self.db_path, exc)
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+            return
+        if "jobs" not in SERVER_FEATURES:
+            SERVER_FEATURES.append("jobs")
+        self._wakeup = asyncio.Event()
+        self._runner = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if "jobs" in SERVER_FEATURES:
+            SERVER_FEATURES.remove("jobs")
+        if self._runner is not None:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+        if self._db is not None:
+            with self._db_lock:
+                self._db.close()
+            self._db = None
+
+
+job_queue = _JobQueue(JOBS_DB_PATH, JOB_WORKERS, JOB_LEASE_SECONDS)
+
 
-    return predicted_smiles
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    _configure_worker()
+    smiles_batcher.start()
+    classifier_batcher.start()
+    model_loader = asyncio.create_task(_load_models())
+    job_queue.start()
+    try:
+        yield
+    finally:
+        model_loader.cancel()
+        await job_queue.stop()
+        await classifier_batcher.stop()
+        await smiles_batcher.stop()
+        inference_executor.shutdown(wait=False, cancel_futures=True)
+        result_cache.close()
+        _release_worker_slot()
 
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 
 def _parse_bool(value, field_name: str, default: bool) -> bool:
@@ -157,20 +2011,130 @@ def _build_response(
     }
 
 
+async def _read_json_object(request: Request, max_bytes: int | None = None) -> dict:
+    """Parses a JSON object body; with max_bytes set, oversized bodies get 413."""
+    if max_bytes is not None:
+        body = await _read_limited_body(request, max_bytes, _raise_batch_too_large)
+    try:
+        payload = json.loads(body) if max_bytes is not None else await request.json()
+    except Exception:
+        raise HTTPException(status_code=400, detail="Malformed JSON payload.")
+
+    if not isinstance(payload, dict):
+        raise HTTPException(
+            status_code=400,
+            detail="JSON payload must be an object.",
+        )
+    return payload
+
+
+def _raise_image_too_large() -> None:
+    raise HTTPException(
+        status_code=413,
+        detail=(
+            "Payload too large for image upload. "
+            f"Maximum allowed size is {MAX_IMAGE_BYTES} bytes."
+        ),
+    )
+
+
+def _raise_batch_too_large() -> None:
+    raise HTTPException(
+        status_code=413,
+        detail=(
+            "Payload too large for batch request. "
+            f"Maximum allowed size is {BATCH_MAX_BODY_BYTES} bytes."
+        ),
+    )
+
+
+async def _read_limited_body(
+    request: Request, max_bytes: int, raise_too_large
+) -> bytes:
+    """Reads a request body, aborting as soon as it exceeds max_bytes."""
+    content_length = request.headers.get("content-length")
+    if content_length is not None and content_length.isdigit():
+        if int(content_length) > max_bytes:
+            raise_too_large()
+
+    body = bytearray()
+    async for chunk in request.stream():
+        body.extend(chunk)
+        if len(body) > max_bytes:
+            raise_too_large()
+    return bytes(body)
+
+
+async def _read_binary_body(request: Request) -> bytes:
+    """Reads a raw image body, aborting as soon as it exceeds MAX_IMAGE_BYTES."""
+    return await _read_limited_body(request, MAX_IMAGE_BYTES, _raise_image_too_large)
+
+
+async def _read_upload_file(upload: UploadFile) -> bytes:
+    if upload.size is not None and upload.size > MAX_IMAGE_BYTES:
+        _raise_image_too_large()
+    image_bytes = await upload.read(MAX_IMAGE_BYTES + 1)
+    if len(image_bytes) > MAX_IMAGE_BYTES:
+        _raise_image_too_large()
+    return image_bytes
+
+
+def _get_flag(request: Request, name: str, header: str, default: bool) -> bool:
+    """Reads a boolean flag from the query string, falling back to a header."""
+
+    value = request.query_params.get(name)
+    if value is None:
+        value = request.headers.get(header)
+    return _parse_bool(value, name, default)
+
+
+def _get_priority(request: Request, value=None) -> str:
+    """Returns the priority lane from a payload field, the query string or X-Priority."""
+
+    if value is None:
+        value = request.query_params.get("priority")
+    if value is None:
+        value = request.headers.get("x-priority")
+    if value is None:
+        return DEFAULT_PRIORITY
+    lane = value.strip().lower() if isinstance(value, str) else None
+    if lane not in PRIORITY_LANES:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Field 'priority' must be one of: {', '.join(PRIORITY_LANES)}.",
+        )
+    return lane
+
+
+def _client_id(request: Request) -> str | None:
+    """Identifies the client for per-client caps: X-Client-Id, else its address."""
+
+    client_id = request.headers.get("x-client-id")
+    if client_id:
+        return client_id
+    return request.client.host if request.client is not None else None
+
+
 async def _extract_request_params(request: Request):
-    content_type = request.headers.get("content-type", "")
+    """Returns (decoded_bytes, is_hand_drawn, classify_image, priority) of a request."""
 
-    if "application/json" in content_type.lower():
-        try:
-            payload = await request.json()
-        except Exception:
-            raise HTTPException(status_code=400, detail="Malformed JSON payload.")
+    content_type = request.headers.get("content-type", "").lower()
 
-        if not isinstance(payload, dict):
+    if content_type.startswith(BINARY_CONTENT_TYPES):
+        decoded_bytes = await _read_binary_body(request)
+        if not decoded_bytes:
             raise HTTPException(
-                status_code=400,
-                detail="JSON payload must be an object.",
+                status_code=422,
+                detail="Binary image upload must not be empty.",
             )
+        is_hand_drawn = _get_flag(request, "is_hand_drawn", "x-is-hand-drawn", False)
+        classify_image = _get_flag(
+            request, "classify_image", "x-classify-image", True
+        )
+        return decoded_bytes, is_hand_drawn, classify_image, _get_priority(request)
+
+    if "application/json" in content_type:
+        payload = await _read_json_object(request)
     else:
         try:
             payload = dict(await request.form())
@@ -180,6 +2144,40 @@ async def _extract_request_params(request: Request):
                 detail="Malformed form payload.",
             )
 
+    image = payload.get("image")
+    if isinstance(image, UploadFile):
+        decoded_bytes = await _read_upload_file(image)
+        if not decoded_bytes:
+            raise HTTPException(
+                status_code=422,
+                detail="File part 'image' must not be empty.",
+            )
+        is_hand_drawn = _parse_bool(
+            payload.get("is_hand_drawn"), "is_hand_drawn", False
+        )
+        classify_image = _parse_bool(
+            payload.get("classify_image"), "classify_image", True
+        )
+        return (
+            decoded_bytes,
+            is_hand_drawn,
+            classify_image,
+            _get_priority(request, payload.get("priority")),
+        )
+
+    return (
+        *_parse_image_payload(payload),
+        _get_priority(request, payload.get("priority")),
+    )
+
+
+def _parse_image_payload(
+    payload: dict,
+    default_hand_drawn: bool = False,
+    default_classify: bool = True,
+):
+    """Validates one image payload and returns (decoded_bytes, is_hand_drawn, classify_image)."""
+
     encoded_image = payload.get("encoded_image")
     if encoded_image is None:
         raise HTTPException(
@@ -208,7 +2206,8 @@ async def _extract_request_params(request: Request):
         )
 
     try:
-        decoded_bytes = base64.b64decode(encoded_image, validate=True)
+        with STAGE_SECONDS.time(stage="base64_decode"), _traced("base64_decode"):
+            decoded_bytes = base64.b64decode(encoded_image, validate=True)
     except (binascii.Error, ValueError):
         raise HTTPException(
             status_code=400,
@@ -221,24 +2220,81 @@ async def _extract_request_params(request: Request):
             detail="Field 'encoded_image' decodes to empty content.",
         )
 
-    is_hand_drawn = _parse_bool(payload.get("is_hand_drawn"), "is_hand_drawn", False)
-    classify_image = _parse_bool(payload.get("classify_image"), "classify_image", True)
+    is_hand_drawn = _parse_bool(
+        payload.get("is_hand_drawn"), "is_hand_drawn", default_hand_drawn
+    )
+    classify_image = _parse_bool(
+        payload.get("classify_image"), "classify_image", default_classify
+    )
 
     return decoded_bytes, is_hand_drawn, classify_image
 
 
 @app.get("/")
 async def root():
-    return {"Message": "Image2smiles converter is up and running."}
+    """Status message; 200 as long as the process answers, see /health/ready."""
+    if _models_ready():
+        return {"Message": "Image2smiles converter is up and running.", "ready": True}
+    return {
+        "Message": "Image2smiles converter is starting, models are still loading.",
+        "ready": False,
+    }
+
+
+@app.get("/health/live")
+async def health_live():
+    """Liveness: the process is up and the event loop answers, models may still load."""
+    uptime_seconds = round(time.time() - SERVER_STARTED_AT, 3)
+    return {"status": "alive", "uptime_seconds": uptime_seconds}
+
+
+@app.get("/health/ready")
+async def health_ready():
+    """Readiness: 200 once every model is loaded and warmed up, 503 before that."""
+    ready = _models_ready()
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"ready": ready, "models": model_status},
+    )
+
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus text exposition of stage latencies, result counters and gauges."""
+    return PlainTextResponse(
+        _render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@app.get("/admin/cache")
+async def cache_status():
+    """Returns size, limits and hit/miss counters of the result cache."""
+    return await result_cache.stats()
+
+
+@app.delete("/admin/cache")
+async def cache_clear():
+    """Drops all cached results (memory and persistent tier) and resets counters."""
+    await result_cache.clear()
+    return await result_cache.stats()
 
 
 @app.get("/system/status")
 async def system_status():
     """Returns system status including hardware accelerator type and TensorFlow version."""
+    if _models_ready():
+        status = "ready"
+    elif any(model["state"] == "failed" for model in model_status.values()):
+        status = "failed"
+    else:
+        status = "loading"
     return {
-        "status": "ready",
+        "status": status,
         "accelerator_type": _get_accelerator_type(),
         "tensorflow_version": tf.__version__,
+        "backend": backend.name,
+        "features": SERVER_FEATURES,
+        "worker": worker_info,
     }
 
 
@@ -259,80 +2315,503 @@ async def http_exception_handler(request, exc):
     return JSONResponse(
         status_code=exc.status_code,
         content={"message": str(exc.detail)},
+        headers=getattr(exc, "headers", None),
     )
 
 
-@app.post("/image2smiles/")
-async def image_to_smiles(
-    request: Request,
-):
+async def _convert_image(
+    decoded_bytes: bytes, is_hand_drawn: bool, classify_image: bool
+) -> dict:
+    """Returns the conversion result for one image, from the result cache if possible.
+
+    The response carries `cached` to tell cache hits from fresh computations.
+    Identical requests arriving while a conversion runs share its result.
     """
-    This function uses encoded image, makes a temporary file and does the conversion to SMILES.
-    Here, the image is first checked if it is a chemical structure.
 
-    encoded_image: base64 encoded image (as string)
-    is_hand_drawn: Boolean indicating if the image is hand-drawn
-    classify_image: Boolean indicating if the image should be classified
+    PAYLOAD_BYTES.observe(len(decoded_bytes))
+    key = _cache_key(decoded_bytes, is_hand_drawn, classify_image)
+    response = None
+    if result_cache.enabled:
+        with _traced("cache_lookup"):
+            response = await result_cache.get(key)
+    cached = response is not None
+    if not cached:
+        response = await _run_coalesced(
+            key, decoded_bytes, is_hand_drawn, classify_image
+        )
+
+    RESULTS.inc(reason=response["reason"] or "success", cached=str(cached).lower())
+    return {**response, "cached": cached}
+
+
+async def _run_coalesced(
+    key: str, decoded_bytes: bytes, is_hand_drawn: bool, classify_image: bool
+) -> dict:
+    """Runs the pipeline for a cache miss, once for all identical concurrent requests.
+
+    The first request for ``key`` starts the conversion as a task of its own; later
+    requests for the same key wait for that task instead of computing again. The
+    task is not tied to any request, so a cancelled request does not fail the
+    others, and it stores its response in the result cache before it finishes.
     """
 
-    decoded_bytes, is_hand_drawn, classify_image = await _extract_request_params(
-        request
-    )
+    conversion = in_flight_conversions.get(key)
+    if conversion is not None:
+        COALESCED.inc()
+        with _traced("coalesced_wait"):
+            return await asyncio.shield(conversion)
 
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".png") as temp_file:
-        temp_file.write(decoded_bytes)
-        temporaryfile = temp_file.name
+    async def convert() -> dict:
+        response = await _run_pipeline(decoded_bytes, is_hand_drawn, classify_image)
+        if result_cache.enabled:
+            await result_cache.put(key, response)
+        return response
 
-    try:
-        classifier_score = None
-        classifier_decision = "not_checked"
+    def forget(task: asyncio.Task) -> None:
+        del in_flight_conversions[key]
+        if not task.cancelled():
+            task.exception()  # retrieved here in case every waiter was cancelled
 
-        if classify_image:
-            classifier_score = decimer_classifier.get_classifier_score(temporaryfile)
-            if classifier_score < IC_THRESHOLD:
-                classifier_decision = "structure_like"
-            else:
-                classifier_decision = "not_structure_like"
-                return _build_response(
-                    smiles=None,
-                    reason="not_chemical_structure",
-                    classifier_score=classifier_score,
-                    threshold=IC_THRESHOLD,
-                    decision=classifier_decision,
-                )
+    conversion = asyncio.create_task(convert())
+    in_flight_conversions[key] = conversion
+    conversion.add_done_callback(forget)
+    return await asyncio.shield(conversion)
 
-        try:
-            decoded_image = config.decode_image(temporaryfile)
-        except Exception:
+
+async def _run_pipeline(
+    decoded_bytes: bytes, is_hand_drawn: bool, classify_image: bool
+) -> dict:
+    """Runs classification and SMILES prediction for one decoded image payload.
+
+    The image is decoded once into a pixel array that feeds both the classifier
+    and the DECIMER preprocessing. Blocking work is offloaded to the inference
+    executor; the DECIMER forward pass goes through the micro-batcher.
+    """
+
+    classifier_score = None
+    classifier_decision = "not_checked"
+
+    try:
+        with _traced("image_decode"):
+            pixels, classifier_pixels = await _run_blocking(
+                _decode_pixels_timed, decoded_bytes
+            )
+    except Exception:
+        return _build_response(
+            smiles=None,
+            reason="decode_failed",
+            classifier_score=classifier_score,
+            threshold=IC_THRESHOLD,
+            decision=classifier_decision,
+        )
+
+    prefilter = classify_image and PREFILTER_MODE != "off"
+    if prefilter:
+        with STAGE_SECONDS.time(stage="prefilter"), _traced("prefilter"):
+            prefilter_check = _prefilter_check(pixels)
+        if prefilter_check is not None and PREFILTER_MODE == "reject":
+            PREFILTER.inc(check=prefilter_check, outcome="rejected")
             return _build_response(
                 smiles=None,
-                reason="decode_failed",
-                classifier_score=classifier_score,
+                reason="prefilter_rejected",
+                classifier_score=None,
                 threshold=IC_THRESHOLD,
-                decision=classifier_decision,
+                decision="not_structure_like",
             )
 
-        smiles = _predict_smiles(decoded_image, is_hand_drawn)
-        if smiles is None:
+    if classify_image:
+        classifier_score = await classifier_batcher.submit(None, classifier_pixels)
+        if classifier_score < IC_THRESHOLD:
+            classifier_decision = "structure_like"
+        else:
+            classifier_decision = "not_structure_like"
+        if prefilter:
+            PREFILTER.inc(
+                check=prefilter_check or "passed", outcome=classifier_decision
+            )
+        if classifier_decision == "not_structure_like":
             return _build_response(
                 smiles=None,
-                reason="prediction_failed",
+                reason="not_chemical_structure",
                 classifier_score=classifier_score,
                 threshold=IC_THRESHOLD,
                 decision=classifier_decision,
             )
 
+    try:
+        with _traced("decimer_preprocess"):
+            decoded_image = await _run_blocking(_decode_for_decimer, pixels)
+    except Exception:
+        return _build_response(
+            smiles=None,
+            reason="decode_failed",
+            classifier_score=classifier_score,
+            threshold=IC_THRESHOLD,
+            decision=classifier_decision,
+        )
+
+    smiles = await smiles_batcher.submit(is_hand_drawn, decoded_image)
+    if smiles is None:
         return _build_response(
-            smiles=smiles,
-            reason=None,
+            smiles=None,
+            reason="prediction_failed",
             classifier_score=classifier_score,
             threshold=IC_THRESHOLD,
             decision=classifier_decision,
         )
+
+    return _build_response(
+        smiles=smiles,
+        reason=None,
+        classifier_score=classifier_score,
+        threshold=IC_THRESHOLD,
+        decision=classifier_decision,
+    )
+
+
+@app.post("/image2smiles/")
+async def image_to_smiles(
+    request: Request,
+):
+    """
+    This function uses encoded image, decodes it in memory and does the conversion to SMILES.
+    Here, the image is first checked if it is a chemical structure.
+    Returns 503 with a Retry-After header when the inference queue is full.
+
+    encoded_image: base64 encoded image (as string)
+    is_hand_drawn: Boolean indicating if the image is hand-drawn
+    classify_image: Boolean indicating if the image should be classified
+
+    Raw image bytes are accepted as well, either as an `application/octet-stream`
+    (or `image/*`) body with the flags in query parameters or X-Is-Hand-Drawn /
+    X-Classify-Image headers, or as a multipart file part named `image`.
+
+    Send `X-Server-Timing: true` to receive a Server-Timing header with the
+    stage durations of this request.
+
+    priority: "interactive" or "bulk" lane (also as X-Priority header)
+    Returns 429 when the client (X-Client-Id or address) has
+    DECIMER_CLIENT_MAX_IN_FLIGHT requests in flight. Bulk requests get 503 once
+    only DECIMER_INTERACTIVE_RESERVED places of the queue are left.
+    """
+
+    _require_ready()
+    server_timing = (
+        _parse_bool(request.headers.get("x-server-timing"), "X-Server-Timing", False)
+        or random.random() < SERVER_TIMING_SAMPLE_RATE
+    )
+    profiling, profiler = (
+        _begin_profile() if random.random() < PROFILE_SAMPLE_RATE else (False, None)
+    )
+    if not (server_timing or profiling):
+        decoded_bytes, is_hand_drawn, classify_image, priority = (
+            await _extract_request_params(request)
+        )
+        async with admission_gate.admit(client=_client_id(request), lane=priority):
+            with _in_lane(priority):
+                return await _convert_image(
+                    decoded_bytes, is_hand_drawn, classify_image
+                )
+
+    trace = _RequestTrace(profiler)
+    token = _request_trace.set(trace)
+    try:
+        decoded_bytes, is_hand_drawn, classify_image, priority = (
+            await _extract_request_params(request)
+        )
+        async with admission_gate.admit(client=_client_id(request), lane=priority):
+            with _in_lane(priority):
+                result = await _convert_image(
+                    decoded_bytes, is_hand_drawn, classify_image
+                )
     finally:
-        if os.path.exists(temporaryfile):
-            os.remove(temporaryfile)
+        _request_trace.reset(token)
+        if profiling:
+            await asyncio.to_thread(_end_profile, profiler)
+
+    headers = {"Server-Timing": trace.server_timing()} if server_timing else None
+    return JSONResponse(result, headers=headers)
+
+
+def _read_batch_items(payload: dict) -> tuple[list, tuple[bool, bool]]:
+    """Returns the items of a batch or job payload and its (is_hand_drawn, classify_image) defaults."""
+
+    items = payload.get("items")
+    if not isinstance(items, list) or not items:
+        raise HTTPException(
+            status_code=422,
+            detail="Field 'items' must be a non-empty list.",
+        )
+    if len(items) > BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=(
+                "Too many items in batch. "
+                f"Maximum allowed number is {BATCH_MAX_ITEMS}."
+            ),
+        )
+
+    defaults = (
+        _parse_bool(payload.get("is_hand_drawn"), "is_hand_drawn", False),
+        _parse_bool(payload.get("classify_image"), "classify_image", True),
+    )
+    return items, defaults
+
+
+def _error_fields(exc: Exception) -> dict:
+    """In-line error of a batch or job item, as the exception handlers would answer."""
+
+    if isinstance(exc, HTTPException):
+        return {"status_code": exc.status_code, "message": str(exc.detail)}
+    return {
+        "status_code": 500,
+        "message": "An unspecified general error in image2smiles API occurred.",
+    }
+
+
+async def _convert_batch_item(
+    index: int, item, defaults: tuple[bool, bool]
+) -> dict:
+    """Converts one batch item, reporting validation and server errors in-line."""
+
+    try:
+        if not isinstance(item, dict):
+            raise HTTPException(
+                status_code=422, detail="Batch items must be JSON objects."
+            )
+        decoded_bytes, is_hand_drawn, classify_image = _parse_image_payload(
+            item, *defaults
+        )
+        result = await _convert_image(decoded_bytes, is_hand_drawn, classify_image)
+    except Exception as exc:
+        return {"index": index, **_error_fields(exc)}
+
+    return {"index": index, **result}
+
+
+@app.post("/image2smiles/batch")
+async def image_to_smiles_batch(
+    request: Request,
+):
+    """
+    Converts many images in one request and streams the results as NDJSON.
+
+    Every line holds the `index` of the item plus the regular /image2smiles/
+    response fields, in completion order. Items that fail validation yield a
+    line with `index`, `status_code` and `message` instead.
+
+    items: list of objects with encoded_image and optional is_hand_drawn/classify_image
+    is_hand_drawn: default for items that do not set the flag
+    classify_image: default for items that do not set the flag
+    priority: "interactive" or "bulk" lane of all items (also as X-Priority header)
+    """
+
+    _require_ready()
+    payload = await _read_json_object(request, BATCH_MAX_BODY_BYTES)
+    items, defaults = _read_batch_items(payload)
+    priority = _get_priority(request, payload.get("priority"))
+    concurrency = min(len(items), BATCH_ITEM_CONCURRENCY)
+    if CLIENT_MAX_IN_FLIGHT:
+        concurrency = min(concurrency, CLIENT_MAX_IN_FLIGHT)
+    concurrency = min(concurrency, admission_gate.lane_capacity(priority))
+    release = admission_gate.acquire(concurrency, _client_id(request), priority)
+
+    async def stream_results():
+        slots = asyncio.Semaphore(concurrency)
+
+        async def run(index: int, item) -> dict:
+            async with slots:
+                with _in_lane(priority):
+                    return await _convert_batch_item(index, item, defaults)
+
+        tasks = [asyncio.create_task(run(i, item)) for i, item in enumerate(items)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield json.dumps(await next_done) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+            release()
+
+    return StreamingResponse(
+        stream_results(),
+        media_type="application/x-ndjson",
+        background=BackgroundTask(release),
+    )
+
+
+def _require_jobs() -> None:
+    if not job_queue.enabled:
+        raise HTTPException(status_code=404, detail="The job API is disabled.")
+
+
+def _parse_job_items(items: list, defaults: tuple[bool, bool]) -> list[tuple]:
+    """Validates job items into (name, image, is_hand_drawn, classify_image, error) tuples.
+
+    Invalid items are kept with their in-line error, so job indices match the
+    submitted items.
+    """
+
+    parsed = []
+    for item in items:
+        name = None
+        try:
+            if not isinstance(item, dict):
+                raise HTTPException(
+                    status_code=422, detail="Job items must be JSON objects."
+                )
+            name = item.get("name")
+            if name is not None and not isinstance(name, str):
+                name = None
+                raise HTTPException(
+                    status_code=422, detail="Field 'name' must be a string."
+                )
+            parsed.append((name, *_parse_image_payload(item, *defaults), None))
+        except HTTPException as exc:
+            parsed.append((name, None, *defaults, _error_fields(exc)))
+    return parsed
+
+
+def _get_query_int(request: Request, name: str, default: int, minimum: int) -> int:
+    value = request.query_params.get(name)
+    if value is None:
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        number = minimum - 1
+    if number < minimum:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Query parameter '{name}' must be an integer >= {minimum}.",
+        )
+    return number
+
+
+def _get_idempotency_key(request: Request) -> str | None:
+    """Returns the Idempotency-Key header; a request repeated with it is stored once."""
+
+    key = request.headers.get("idempotency-key")
+    if key is not None and not 0 < len(key) <= 255:
+        raise HTTPException(
+            status_code=422,
+            detail="Header 'Idempotency-Key' must have 1 to 255 characters.",
+        )
+    return key
+
+
+async def _job_status_or_404(job_id: str) -> dict:
+    status = await job_queue.status(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return status
+
+
+@app.post("/jobs")
+async def create_job(request: Request):
+    """
+    Queues images for background conversion and answers 202 with the job status.
+
+    Takes the /image2smiles/batch payload; items may carry a `name` that is
+    returned with their result. Jobs are stored on disk and converted by
+    background workers as fast as the models allow, also while models load or
+    after a restart. Larger sets are submitted in parts with POST /jobs/{job_id}/items.
+    Send an Idempotency-Key header to make retries of the request safe.
+    """
+
+    _require_jobs()
+    request_key = _get_idempotency_key(request)
+    items, defaults = _read_batch_items(
+        await _read_json_object(request, BATCH_MAX_BODY_BYTES)
+    )
+    job_id = await job_queue.add_items(
+        uuid.uuid4().hex,
+        _parse_job_items(items, defaults),
+        create=True,
+        request_key=request_key,
+    )
+    return JSONResponse(status_code=202, content=await _job_status_or_404(job_id))
+
+
+@app.post("/jobs/{job_id}/items")
+async def add_job_items(job_id: str, request: Request):
+    """Appends items (same payload as POST /jobs) to a job; their indices continue the job's."""
+
+    _require_jobs()
+    request_key = _get_idempotency_key(request)
+    items, defaults = _read_batch_items(
+        await _read_json_object(request, BATCH_MAX_BODY_BYTES)
+    )
+    if not await job_queue.add_items(
+        job_id,
+        _parse_job_items(items, defaults),
+        create=False,
+        request_key=request_key,
+    ):
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return JSONResponse(status_code=202, content=await _job_status_or_404(job_id))
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Returns the state of a job (queued, running, completed, cancelled) and item counts."""
+
+    _require_jobs()
+    return await _job_status_or_404(job_id)
+
+
+@app.get("/jobs/{job_id}/results")
+async def get_job_results(job_id: str, request: Request):
+    """
+    Returns one page of finished results, in completion order.
+
+    Every result holds the item `index` and `name` plus the /image2smiles/
+    response fields, or `status_code` and `message` for failed items. Pass the
+    returned `next_cursor` as `cursor` to get the following page; pages of a
+    running job grow as items finish.
+
+    cursor: position after the last result already read (default 0)
+    limit: maximum number of results (default 100, at most 1000)
+    """
+
+    _require_jobs()
+    cursor = _get_query_int(request, "cursor", 0, minimum=0)
+    limit = min(_get_query_int(request, "limit", 100, minimum=1), 1000)
+    status = await _job_status_or_404(job_id)
+    results = await job_queue.results(job_id, cursor, limit)
+    return {
+        "job_id": job_id,
+        "state": status["state"],
+        "results": results,
+        "next_cursor": cursor + len(results),
+    }
+
+
+@app.post("/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    """Cancels the queued items of a job; items already being converted still finish."""
+
+    _require_jobs()
+    if not await job_queue.cancel(job_id):
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return await _job_status_or_404(job_id)
+
+
+@app.delete("/jobs/{job_id}")
+async def delete_job(job_id: str):
+    """Cancels a job and deletes it with all its results."""
+
+    _require_jobs()
+    if not await job_queue.delete(job_id):
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return {"job_id": job_id, "deleted": True}
 
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8099)
+    if WORKER_PROCESSES > 1:
+        # Workers import the app by name and each loads its own copy of the models.
+        uvicorn.run(
+            "decimer_server:app", host="0.0.0.0", port=8099, workers=WORKER_PROCESSES
+        )
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=8099)
@@ -1,4 +1,4 @@
-__version__ = "1.0.3"
+__version__ = "1.1.0"
 
 # change init file for the api adaption and local installtion
 from .decimer_image_classifier import DecimerImageClassifier
@@ -2,11 +2,14 @@
 # changed by DocMinus:
 # removed the image.save() from the original code
 # changed all keras calls to tf.keras calls
+# added batched, single-channel preprocessing (_get_model_inputs)
+# added the _scores hook used by the TFLite variant (tflite.py)
 
 import os
 from copy import copy
 from typing import TYPE_CHECKING
 
+import numpy as np
 import tensorflow as tf
 from PIL import Image
 
@@ -19,7 +22,18 @@ if TYPE_CHECKING:
 class DecimerImageClassifier:
     """Class that wraps up the functionalities of the image classifier"""
 
-    def __init__(self):
+    def __init__(self, reducing_gap: float | None = None):
+        """
+        Args:
+            reducing_gap (float | None): Opt-in speed-up for large scans: they are
+                first shrunk with a cheap box filter to at most reducing_gap
+                times the model input size before the LANCZOS resize (see PIL
+                Image.resize). This shifts the scores slightly, so check it
+                against your threshold first (see the server's
+                benchmarks/check_classifier_preprocessing.py --reducing-gap).
+                None (default) resizes with LANCZOS only, like the original code.
+        """
+        self.reducing_gap = reducing_gap
         # Establish GPU growth, load default GPU
         os.environ["CUDA_VISIBLE_DEVICES"] = "0"
         gpus = tf.config.experimental.list_physical_devices("GPU")
@@ -28,15 +42,25 @@ class DecimerImageClassifier:
         # Load model
         model_path = os.path.join(os.path.split(__file__)[0], "model")
         self.model = tf.keras.models.load_model(model_path)
+        # Traced once with a fixed signature (any batch size of 224x224 RGB),
+        # so single and batched calls skip model.predict and retracing.
+        self._score_fn = tf.function(
+            self._score_batch,
+            input_signature=[
+                tf.TensorSpec(shape=[None, 224, 224, 3], dtype=tf.float32)
+            ],
+        )
+        # Warm-up: the first real request should not pay tracing/allocation cost
+        self.get_classifier_score(Image.new("RGB", (224, 224), "white"))
 
     def is_chemical_structure(self, img=False, threshold: float = 0.000089) -> bool:
         """
         This function determines whether or not a given image (given as
-        PIL.Image or as a path of an image (str)) is a chemical structure
-        depiction.
+        PIL.Image, numpy array or as a path of an image (str)) is a chemical
+        structure depiction.
 
         Args:
-            img (PIL.Image)/ img (str): Image object or Path of image that is supposed to get classified
+            img (PIL.Image)/ img (np.ndarray)/ img (str): Image object, pixel array or Path of image that is supposed to get classified
             # img or img path needs to be specified!
             threshold (float): Threshold for classification
 
@@ -49,6 +73,20 @@ class DecimerImageClassifier:
         else:
             return False
 
+    def is_chemical_structures(self, images, threshold: float = 0.000089) -> list:
+        """
+        Batched variant of is_chemical_structure: classifies all images with a
+        single forward pass.
+
+        Args:
+            images (list): PIL.Image objects, numpy arrays and/or image paths (str)
+            threshold (float): Threshold for classification
+
+        Returns:
+            Result (list[bool]): one decision per input image, in order.
+        """
+        return [score <= threshold for score in self.get_classifier_scores(images)]
+
     def get_classifier_score(
         self,
         img=False,
@@ -57,21 +95,117 @@ class DecimerImageClassifier:
         Function to compute the classifier score for a particular image.
 
         Args:
-            img (PIL.Image)/ img (str): Image object or Path of image that is supposed to get classified
+            img (PIL.Image)/ img (np.ndarray)/ img (str): Image object, pixel array
+                (uint8, grayscale/RGB/RGBA) or Path of image that is supposed to get classified
             # img or img path needs to be specified!
 
         Returns:
             score (float): the image predicted score.
         """
-        if type(img) == str:
-            img = Image.open(img)
-        img = self._get_resized_grayscale_image(img)
-        img_array = tf.keras.preprocessing.image.img_to_array(img)
-        img_array = tf.expand_dims(img_array, 0)
+        return self._scores(self._get_model_inputs([img]))[0]
+
+    def get_classifier_scores(self, images) -> list:
+        """
+        Function to compute the classifier scores for several images at once.
+        All images are preprocessed into one tensor and scored with a single
+        forward pass, avoiding the per-call overhead of model.predict.
+
+        Args:
+            images (list): PIL.Image objects, numpy arrays and/or image paths (str)
+
+        Returns:
+            scores (list[float]): the predicted score of every image, in order.
+        """
+        if len(images) == 0:
+            return []
+        scores = self._scores(self._get_model_inputs(images))
+        return [float(score) for score in scores]
+
+    def _scores(self, model_inputs: np.ndarray) -> np.ndarray:
+        """
+        Runs the model on preprocessed inputs; the only step that differs
+        between the Keras model and its TFLite conversion.
+
+        Args:
+            model_inputs (np.ndarray): float32 array of shape (batch, 224, 224, 3)
+
+        Returns:
+            np.ndarray: float32 array of shape (batch,) with the scores
+        """
+        return self._score_fn(model_inputs).numpy()
+
+    def _score_batch(self, img_array: tf.Tensor) -> tf.Tensor:
+        """
+        Graph body of the scoring function: EfficientNet input preprocessing,
+        forward pass and sigmoid for a batch of resized grayscale images.
+
+        Args:
+            img_array (tf.Tensor): float32 tensor of shape (batch, 224, 224, 3)
+
+        Returns:
+            tf.Tensor: float32 tensor of shape (batch,) with the scores
+        """
         img_array = tf.keras.applications.efficientnet.preprocess_input(img_array)
-        predictions = self.model.predict(img_array)
-        score = tf.nn.sigmoid(predictions[0])
-        return score.numpy()[0]
+        predictions = self.model(img_array, training=False)
+        return tf.nn.sigmoid(predictions[:, 0])
+
+    def _get_model_inputs(self, images, desired_size: int = 224) -> np.ndarray:
+        """
+        Batched counterpart of _get_resized_grayscale_image: converts every
+        image to a single grayscale channel, resizes it (aspect preserving) and
+        pads it onto one white uint8 canvas array for the whole batch.
+        The grayscale conversion and LANCZOS resize still run per image in PIL,
+        as the images differ in size; they work on one channel instead of three,
+        and the padding and RGB expansion are done once for the batch. The
+        result stays within rounding of the PIL reference chain; an opt-in
+        reducing_gap additionally pre-shrinks large scans.
+
+        Args:
+            images (list): PIL.Image objects, numpy arrays and/or image paths (str)
+            desired_size (int, optional): Desired image height/length.
+                                          Defaults to 224.
+
+        Returns:
+            np.ndarray: float32 array of shape (len(images), desired_size, desired_size, 3)
+        """
+        batch = np.full((len(images), desired_size, desired_size), 255, np.uint8)
+        for index, img in enumerate(images):
+            if type(img) == str:
+                img = Image.open(img)
+            elif isinstance(img, np.ndarray):
+                img = Image.fromarray(img)
+            resized = self._get_resized_grayscale_array(img, desired_size)
+            height, width = resized.shape
+            top = (desired_size - height) // 2
+            left = (desired_size - width) // 2
+            batch[index, top : top + height, left : left + width] = resized
+        return np.repeat(batch[..., np.newaxis], 3, axis=-1).astype(np.float32)
+
+    def _get_resized_grayscale_array(
+        self, img: "PilImage", desired_size: int = 224
+    ) -> np.ndarray:
+        """
+        This function takes a PIL.Image object, converts it to a single
+        grayscale channel (transparency flattened onto white) and resizes it so
+        that its longer side equals desired_size. No padding is applied.
+
+        Args:
+            img (Image): PIL.Image object
+            desired_size (int, optional): Desired image height/length.
+                                          Defaults to 224.
+
+        Returns:
+            np.ndarray: uint8 array of shape (height, width)
+        """
+        if img.mode == "RGBA":
+            flattened = Image.new("RGB", img.size, (255, 255, 255))
+            flattened.paste(img, mask=img.getchannel("A"))
+            img = flattened
+        img = img.convert("L")
+        ratio = float(desired_size) / max(img.size)
+        new_size = tuple([max(1, int(x * ratio)) for x in img.size])
+        img = img.resize(new_size, Image.LANCZOS, reducing_gap=self.reducing_gap)
+        return np.asarray(img)
 
     def _get_resized_grayscale_image(
         self, img: "PilImage", desired_size: int = 224
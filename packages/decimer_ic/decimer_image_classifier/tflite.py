@@ -0,0 +1,144 @@
+# TFLite variant of the image classifier:
+# post-training quantized conversion of the bundled model and a classifier
+# that scores with the TFLite interpreter instead of Keras.
+#
+# Usage:
+#     python -m decimer_image_classifier.tflite classifier.tflite
+#     python -m decimer_image_classifier.tflite classifier_int8.tflite --quantization int8 --representative-dir images/
+
+import argparse
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+import tensorflow as tf
+from PIL import Image
+
+from .decimer_image_classifier import DecimerImageClassifier
+
+QUANTIZATIONS = ("dynamic", "float16", "int8", "none")
+
+
+def convert_to_tflite(
+    output_path: str | Path,
+    quantization: str = "dynamic",
+    representative_images: list | None = None,
+) -> Path:
+    """
+    Converts the bundled Keras model (including EfficientNet preprocessing and
+    the final sigmoid) into a TFLite model with post-training quantization.
+
+    Args:
+        output_path (str | Path): where to write the .tflite file
+        quantization (str): "dynamic" (int8 weights, float activations),
+            "float16" (float16 weights), "int8" (int8 weights and activations,
+            calibrated on representative_images) or "none"
+        representative_images (list, optional): PIL.Image objects, numpy arrays
+            and/or image paths (str) used to calibrate "int8" quantization.
+            A few hundred typical inputs are enough.
+
+    Returns:
+        Path: the path of the written model
+    """
+    if quantization not in QUANTIZATIONS:
+        raise ValueError(f"quantization must be one of {', '.join(QUANTIZATIONS)}")
+    if quantization == "int8" and not representative_images:
+        raise ValueError("int8 quantization needs representative_images")
+
+    classifier = DecimerImageClassifier()
+    converter = tf.lite.TFLiteConverter.from_concrete_functions(
+        [classifier._score_fn.get_concrete_function()], classifier.model
+    )
+    if quantization != "none":
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if quantization == "float16":
+        converter.target_spec.supported_types = [tf.float16]
+    elif quantization == "int8":
+
+        def representative_dataset():
+            for image in representative_images:
+                yield [classifier._get_model_inputs([image])]
+
+        converter.representative_dataset = representative_dataset
+
+    output_path = Path(output_path)
+    output_path.write_bytes(converter.convert())
+    return output_path
+
+
+class DecimerImageClassifierLite(DecimerImageClassifier):
+    """Image classifier that scores with a TFLite model (see convert_to_tflite)"""
+
+    def __init__(
+        self,
+        model_path: str | Path,
+        reducing_gap: float | None = None,
+        num_threads: int | None = None,
+    ):
+        """
+        Args:
+            model_path (str | Path): .tflite file written by convert_to_tflite
+            reducing_gap (float | None): see DecimerImageClassifier
+            num_threads (int, optional): CPU threads per interpreter;
+                None lets TFLite decide.
+        """
+        self.reducing_gap = reducing_gap
+        self.num_threads = num_threads
+        self._model_content = Path(model_path).read_bytes()
+        # Interpreters are not thread-safe: every thread gets its own, resized
+        # to the batch size of its last call.
+        self._local = threading.local()
+        # Warm-up: the first real request should not pay allocation cost
+        self.get_classifier_score(Image.new("RGB", (224, 224), "white"))
+
+    def _get_interpreter(self, batch_size: int) -> "tf.lite.Interpreter":
+        local = self._local
+        if getattr(local, "interpreter", None) is None:
+            local.interpreter = tf.lite.Interpreter(
+                model_content=self._model_content, num_threads=self.num_threads
+            )
+            local.batch_size = None
+        if local.batch_size != batch_size:
+            input_index = local.interpreter.get_input_details()[0]["index"]
+            local.interpreter.resize_tensor_input(
+                input_index, [batch_size, 224, 224, 3]
+            )
+            local.interpreter.allocate_tensors()
+            local.batch_size = batch_size
+        return local.interpreter
+
+    def _scores(self, model_inputs: np.ndarray) -> np.ndarray:
+        interpreter = self._get_interpreter(len(model_inputs))
+        interpreter.set_tensor(
+            interpreter.get_input_details()[0]["index"], model_inputs
+        )
+        interpreter.invoke()
+        return interpreter.get_tensor(interpreter.get_output_details()[0]["index"])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Converts the bundled classifier model to a quantized TFLite model."
+    )
+    parser.add_argument("output", help=".tflite file to write")
+    parser.add_argument("--quantization", choices=QUANTIZATIONS, default="dynamic")
+    parser.add_argument(
+        "--representative-dir",
+        help="directory of typical input images, required for int8 quantization",
+    )
+    args = parser.parse_args()
+
+    representative_images = None
+    if args.representative_dir:
+        representative_images = [
+            entry.path
+            for entry in sorted(os.scandir(args.representative_dir), key=lambda e: e.name)
+            if entry.name.lower().endswith((".png", ".jpg", ".jpeg", ".gif"))
+        ]
+    output = convert_to_tflite(args.output, args.quantization, representative_images)
+    print(f"Wrote {output} ({output.stat().st_size / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
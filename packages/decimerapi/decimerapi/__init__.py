@@ -1,3 +1,4 @@
 __version__ = "1.4.0"
 
-from .decimerapi import DecimerAPI
+from .async_decimerapi import AsyncDecimerAPI
+from .decimerapi import DecimerAPI, JobSubmitError
@@ -0,0 +1,348 @@
+"""
+module: async_decimerapi.py
+
+license: MIT
+asyncio client for the DECIMER server, the counterpart of DecimerAPI for event-loop based services.
+Requires httpx (pip install "decimerapi[async]"). File reading, base64 encoding and EMF conversion
+run in worker threads so they never block the event loop.
+"""
+
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterator, Iterable
+from pathlib import Path
+from typing import Any
+
+from .decimerapi import RETRY_STATUS_CODES, _ImagePayloads
+from .emf import EmfConverter
+
+try:
+    import httpx
+except ImportError:  # optional dependency, see the "async" extra
+    httpx = None
+
+
+class AsyncDecimerAPI(_ImagePayloads):
+    """
+    AsyncDecimerAPI class for interacting with the DECIMER image-to-SMILES server from asyncio code.
+
+    Attributes:
+        DECIMER_URL (str): The URL of the DECIMER API endpoint.
+
+    Methods:
+        __init__(host: str = "localhost", port: int = 8099, binary_upload: bool | None = None, pool_size: int = 10, timeout: float | tuple[float, float] = (5.0, 300.0), retries: int = 3, backoff_factor: float = 0.5, emf_cache_dir: Path | str | None = None, emf_workers: int = 2, max_side: int | None = None, priority: str | None = None):
+            Same options as DecimerAPI. Use it as an async context manager, or call aclose().
+
+        async call_image2smiles(input_image: Path | str, hand_drawn: bool = False, classify_image: bool = True) -> str | None:
+            Calls the DECIMER API and returns only the SMILES value.
+
+        async call_image2smiles_with_meta(input_image: Path | str, hand_drawn: bool = False, classify_image: bool = True, server_timing: bool = False) -> dict[str, Any] | None:
+            Calls the DECIMER API and returns the full response JSON, including metadata fields.
+
+        call_image2smiles_many(input_images: Iterable[Path | str], concurrency: int = 8, hand_drawn: bool = False, classify_image: bool = True, ordered: bool = True) -> AsyncIterator[dict[str, Any]]:
+            Converts many images with at most `concurrency` requests in flight, yielding per-image results or errors.
+
+        async server_status() -> str:
+            Returns a simple status string based on the server root endpoint response, including whether the models are still loading.
+
+        async get_system_status() -> dict[str, Any] | None:
+            Retrieve system status including hardware acceleration information (CPU/CUDA/Metal).
+    """
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 8099,
+        binary_upload: bool | None = None,
+        pool_size: int = 10,
+        timeout: float | tuple[float, float] = (5.0, 300.0),
+        retries: int = 3,
+        backoff_factor: float = 0.5,
+        emf_cache_dir: Path | str | None = None,
+        emf_workers: int = 2,
+        max_side: int | None = None,
+        priority: str | None = None,
+    ):
+        """
+        Args:
+            host: server host name or IP address
+            port: server port
+            binary_upload: send raw image bytes instead of base64 form fields.
+                None (default) uses binary uploads when the server advertises support.
+            pool_size: max number of concurrent (kept-alive) connections to the server
+            timeout: seconds to wait for the connection and for the response,
+                either one value for both or a (connect, read) tuple
+            retries: retries on connection errors and 429/502/503/504 responses
+            backoff_factor: exponential backoff between retries
+                (backoff_factor * 2 ** (retry - 1) seconds); a Retry-After header wins.
+            emf_cache_dir: directory for the PNGs rendered from EMF files
+                (default: ~/.cache/decimerapi/emf)
+            emf_workers: number of Inkscape processes converting EMF files in parallel
+            max_side: downscale images to at most max_side pixels per side and upload
+                them as grayscale PNG (requires Pillow); None sends the files unchanged
+            priority: server-side priority lane of every request, "interactive" or
+                "bulk"; None (default) leaves the choice to the server
+        """
+        if httpx is None:
+            raise ImportError(
+                'AsyncDecimerAPI requires httpx: pip install "decimerapi[async]"'
+            )
+
+        self.DECIMER_URL = f"http://{host}:{port}"
+        self.binary_upload = binary_upload
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.emf_converter = EmfConverter(emf_cache_dir, emf_workers)
+        self._check_downscale_support(max_side)
+        self.max_side = max_side
+
+        connect_timeout, read_timeout = (
+            timeout if isinstance(timeout, tuple) else (timeout, timeout)
+        )
+        self.client = httpx.AsyncClient(
+            base_url=self.DECIMER_URL,
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(
+                max_connections=pool_size, max_keepalive_connections=pool_size
+            ),
+            headers={"X-Priority": priority} if priority is not None else None,
+        )
+
+    async def __aenter__(self) -> "AsyncDecimerAPI":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Closes the pooled connections to the server."""
+        await self.client.aclose()
+
+    def _retry_delay(self, attempt: int, response: "httpx.Response | None") -> float:
+        if response is not None:
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                return float(retry_after)
+        return self.backoff_factor * 2**attempt
+
+    async def _request(self, method: str, url: str, **kwargs) -> "httpx.Response":
+        """Sends a request, retrying connection errors and 429/502/503/504 responses."""
+        for attempt in range(self.retries + 1):
+            try:
+                response = await self.client.request(method, url, **kwargs)
+            except httpx.TransportError:
+                if attempt == self.retries:
+                    raise
+                response = None
+            else:
+                if (
+                    response.status_code not in RETRY_STATUS_CODES
+                    or attempt == self.retries
+                ):
+                    return response
+            await asyncio.sleep(self._retry_delay(attempt, response))
+
+    async def _uses_binary_upload(self) -> bool:
+        """Resolves binary upload support, asking the server when not configured.
+
+        Only an answer of the server is kept: while it cannot be reached, base64
+        uploads are used and the next call asks again.
+        """
+        if self.binary_upload is None:
+            status = await self._fetch_system_status()
+            if not isinstance(status, dict):
+                return False
+            self.binary_upload = "binary_upload" in status.get("features", [])
+        return self.binary_upload
+
+    async def _send_image2smiles(
+        self,
+        image_bytes: bytes,
+        hand_drawn: bool,
+        classify_image: bool,
+        headers: dict[str, str] | None = None,
+    ) -> "httpx.Response":
+        if await self._uses_binary_upload():
+            return await self._request(
+                "POST",
+                "/image2smiles/",
+                content=image_bytes,
+                params={
+                    "is_hand_drawn": str(hand_drawn).lower(),
+                    "classify_image": str(classify_image).lower(),
+                },
+                headers={"Content-Type": "application/octet-stream", **(headers or {})},
+            )
+
+        data = await asyncio.to_thread(
+            self._encode_request_data, image_bytes, hand_drawn, classify_image
+        )
+        return await self._request("POST", "/image2smiles/", data=data, headers=headers)
+
+    async def call_image2smiles(
+        self,
+        input_image: Path | str,
+        hand_drawn: bool = False,
+        classify_image: bool = True,
+    ) -> str | None:
+        """Calls DECIMER server to convert an image to a SMILES string.
+
+        Checks for correct image type and size before sending the image to the server.
+        Converts EMF images to PNG if Inkscape is installed.
+        Args:
+            input_image: Path (or string) to the image file
+            hand_drawn: Boolean indicating if the image is hand-drawn
+            classify_image: Boolean indicating if the image should be classified
+        """
+        response_json = await self.call_image2smiles_with_meta(
+            input_image, hand_drawn, classify_image
+        )
+        if response_json is None:
+            return None
+
+        return response_json["smiles"]
+
+    async def call_image2smiles_with_meta(
+        self,
+        input_image: Path | str,
+        hand_drawn: bool = False,
+        classify_image: bool = True,
+        server_timing: bool = False,
+    ) -> dict[str, Any] | None:
+        """Calls DECIMER server and returns the full response payload.
+
+        With `server_timing=True` (or when the server samples the request) the result
+        also carries `server_timing`: {stage: duration in milliseconds}.
+        """
+        image_bytes = await asyncio.to_thread(self._read_image_bytes, input_image)
+        if image_bytes is None:
+            return None
+
+        headers = {"X-Server-Timing": "true"} if server_timing else None
+        response = await self._send_image2smiles(
+            image_bytes, hand_drawn, classify_image, headers
+        )
+        if response.status_code != 200:
+            error_message = self._extract_error_message(response)
+            print(f"Error: {response.status_code} - {error_message}")
+            return None
+
+        result = response.json()
+        if "Server-Timing" in response.headers:
+            result["server_timing"] = self._parse_server_timing(
+                response.headers["Server-Timing"]
+            )
+        return result
+
+    async def _convert_one(
+        self,
+        index: int,
+        input_image: Path | str,
+        hand_drawn: bool,
+        classify_image: bool,
+    ) -> dict[str, Any]:
+        """Reads, encodes and converts one image; errors are returned, not printed."""
+        try:
+            image_bytes = await asyncio.to_thread(self._load_image_bytes, input_image)
+            response = await self._send_image2smiles(
+                image_bytes, hand_drawn, classify_image
+            )
+        except httpx.HTTPError as exc:
+            return {
+                "index": index,
+                "status_code": None,
+                "message": str(exc),
+                "retryable": True,
+            }
+        except (OSError, ValueError) as exc:
+            return {"index": index, "status_code": None, "message": str(exc)}
+        return self._response_result(index, response)
+
+    async def call_image2smiles_many(
+        self,
+        input_images: Iterable[Path | str],
+        concurrency: int = 8,
+        hand_drawn: bool = False,
+        classify_image: bool = True,
+        ordered: bool = True,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Converts many images, keeping up to `concurrency` requests in flight.
+
+        Yields the same dicts as DecimerAPI.call_image2smiles_many: `index` plus the
+        response fields, or `status_code`/`message` for failed items.
+        Results are yielded in input order, or as they complete with `ordered=False`.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        await self._uses_binary_upload()
+        pending: deque[asyncio.Task] = deque()
+        items = enumerate(input_images)
+
+        async def convert(index: int, input_image: Path | str) -> dict[str, Any]:
+            async with semaphore:
+                return await self._convert_one(
+                    index, input_image, hand_drawn, classify_image
+                )
+
+        def submit_next() -> bool:
+            for index, input_image in items:
+                pending.append(asyncio.create_task(convert(index, input_image)))
+                return True
+            return False
+
+        # Same bounded window as the sync client: `input_images` is consumed
+        # lazily and only about twice `concurrency` tasks exist at any time.
+        for _ in range(concurrency * 2):
+            if not submit_next():
+                break
+
+        try:
+            while pending:
+                if ordered:
+                    await asyncio.wait([pending[0]])
+                    task = pending.popleft()
+                else:
+                    done, _ = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    task = done.pop()
+                    pending.remove(task)
+                submit_next()
+                yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def server_status(self) -> str:
+        """Check the status of the DECIMER server (see DecimerAPI.server_status)."""
+        response = await self._request("GET", "/")
+        return self._status_message(response)
+
+    async def get_system_status(self) -> dict[str, Any] | None:
+        """Retrieve system status including hardware acceleration information.
+
+        Returns the same dict as DecimerAPI.get_system_status, or None if the server
+        is unreachable or returns an invalid response.
+        """
+        try:
+            response = await self._request("GET", "/system/status")
+            if response.status_code != 200:
+                print(f"Error: Server returned status code {response.status_code}")
+                return None
+
+            return response.json()
+        except httpx.HTTPError as e:
+            print(f"Error connecting to DECIMER server: {e}")
+            return None
+
+    async def _fetch_system_status(self) -> dict[str, Any] | None:
+        """Silent variant of get_system_status used for feature detection."""
+        try:
+            response = await self._request("GET", "/system/status")
+        except httpx.HTTPError:
+            return None
+        if response.status_code != 200:
+            return None
+        try:
+            return response.json()
+        except ValueError:
+            return None
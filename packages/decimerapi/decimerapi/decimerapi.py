@@ -10,60 +10,119 @@ working tools implementation, now as class to submit a different port
 typo fixed; host added to __init__ method, allows to run not just locally
 now automatic EMF to PNG conversion based on Inkscape presence. See readme for installation instructions.
 Added API hardening compatibility helpers and metadata response support.
+Requests go through a pooled keep-alive session with timeouts and retries.
+EMF conversion is batched, parallel and cached by content hash (see emf.py).
+Optional downscaling to compact grayscale PNG before upload (requires Pillow).
+Asynchronous jobs for large image sets: submit, poll and page through results.
 """
 
 import base64
 import imghdr
-import subprocess
+import io
+import json
+import time
+import uuid
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
 from shutil import which
 from typing import Any
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .emf import EmfConverter
+
+try:
+    from PIL import Image
+except ImportError:  # optional dependency, see the "downscale" extra
+    Image = None
 
 # determine if Inkscape is installed. If not, EMF conversion will be disabled.
 INKSCAPE = True if which("inkscape") is not None else False
+MAX_IMAGE_BYTES = 4 * 1024 * 1024
+# Server answers that are retried (and, once retries run out, worth retrying later).
+RETRY_STATUS_CODES = (429, 502, 503, 504)
 
 
-class DecimerAPI:
+class JobSubmitError(Exception):
+    """A submit_job upload failed after the job was created.
+
+    The job keeps the images uploaded before the failure: `job_id` names it and
+    `submitted` counts the images it holds, so they can be read or the job can
+    be cancelled instead of being lost.
     """
-    DecimerAPI class for interacting with the DECIMER image-to-SMILES server.
 
-    Attributes:
-        DECIMER_URL (str): The URL of the DECIMER API endpoint.
+    def __init__(self, job_id: str, submitted: int, message: str):
+        super().__init__(message)
+        self.job_id = job_id
+        self.submitted = submitted
 
-    Methods:
-        __init__(host: str = "localhost", port: int = 8099):
-            Initializes the DecimerAPI instance with the specified host and port, defaulting to localhost 8099.
 
-        _is_valid_image_type(encoded_image: bytes) -> bool:
-            Checks if the base64-encoded image is of type JPG, PNG, GIF, EMF.
+def _map_concurrently(
+    func: Callable, items: Iterable, concurrency: int, ordered: bool = True
+) -> Iterator:
+    """Applies func to items on a thread pool, keeping a bounded window in flight.
 
-        _convert_emf2png(input_path: Path) -> Path:
-            Converts an EMF file to PNG using Inkscape.
+    At most `concurrency` calls run at once and about as many more are queued, so
+    `items` is consumed lazily and memory stays bounded for any number of items.
+    Results are yielded in input order, or as they complete with `ordered=False`.
+    """
+    pending: deque = deque()
+    items = iter(items)
 
-        call_image2smiles(input_image: Path | str, hand_drawn: bool = False, classify_image: bool = True) -> str | None:
-            Calls the DECIMER API and returns only the SMILES value (backwards compatible behavior).
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
 
-        call_image2smiles_with_meta(input_image: Path | str, hand_drawn: bool = False, classify_image: bool = True) -> dict[str, Any] | None:
-            Calls the DECIMER API and returns the full response JSON, including metadata fields.
+        def submit_next() -> bool:
+            for item in items:
+                pending.append(executor.submit(func, item))
+                return True
+            return False
 
-        server_status() -> str:
-            Returns a simple status string based on the server root endpoint response.
+        # Keep a few more items queued than in flight so no worker sits idle.
+        for _ in range(concurrency * 2):
+            if not submit_next():
+                break
 
-        get_system_status() -> dict[str, Any] | None:
-            Retrieve system status including hardware acceleration information (CPU/CUDA/Metal).
-    """
+        while pending:
+            if ordered:
+                future = pending.popleft()
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                future = done.pop()
+                pending.remove(future)
+            submit_next()
+            yield future.result()
 
-    def __init__(self, host: str = "localhost", port: int = 8099):
-        self.DECIMER_URL = f"http://{host}:{port}"
+
+class _ImagePayloads:
+    """Image validation, EMF conversion and payload encoding shared by the clients."""
+
+    emf_converter: EmfConverter | None = None
+    max_side: int | None = None
+
+    @staticmethod
+    def _check_downscale_support(max_side: int | None) -> None:
+        if max_side is not None and Image is None:
+            raise ImportError(
+                'Downscaling (max_side) requires Pillow: pip install "decimerapi[downscale]"'
+            )
 
     def _is_valid_image_type(self, encoded_image: str) -> tuple[bool, bool]:
         """Checks if the base64-encoded image is of type JPG, PNG, GIF or EMF.
         Returns a tuple of two booleans: (is_emf, is_valid_image)
         """
 
-        decoded_image = base64.b64decode(encoded_image)
+        return self._detect_image_type(base64.b64decode(encoded_image))
+
+    @staticmethod
+    def _detect_image_type(decoded_image: bytes) -> tuple[bool, bool]:
+        """Checks if the raw image bytes are of type JPG, PNG, GIF or EMF.
+        Returns a tuple of two booleans: (is_emf, is_valid_image)
+        """
+
         image_type = imghdr.what(None, h=decoded_image)
         # emf requires separate check, as imghdr does not support it
         # could one check file ending? possibly, but not reliable
@@ -73,6 +132,66 @@ class DecimerAPI:
         is_emf = image_type == "emf"
         return is_emf, image_type in ["jpeg", "png", "gif", "emf"]
 
+    @staticmethod
+    def _parse_server_timing(header: str) -> dict[str, float]:
+        """Parses a Server-Timing header into {stage: duration in milliseconds}."""
+        timings = {}
+        for entry in header.split(","):
+            name, *params = [part.strip() for part in entry.split(";")]
+            for param in params:
+                key, _, value = param.partition("=")
+                if key == "dur":
+                    try:
+                        timings[name] = float(value)
+                    except ValueError:
+                        pass
+        return timings
+
+    @staticmethod
+    def _status_message(response) -> str:
+        """Maps the answer of the root endpoint to a status message.
+
+        The root endpoint answers 200 while the models load, with "ready": false;
+        servers older than that field are taken as ready.
+        """
+        if response.status_code != 200:
+            return "Server is not running."
+        try:
+            ready = response.json().get("ready", True)
+        except (ValueError, AttributeError):
+            ready = True
+        if not ready:
+            return "Server is starting, models are still loading."
+        return "Server is running."
+
+    @classmethod
+    def _response_result(cls, index: int, response) -> dict[str, Any]:
+        """Turns a /image2smiles/ response into a result or error dict for `index`.
+
+        Errors a later attempt may resolve (429/502/503/504 after the client's own
+        retries) are marked with `"retryable": True`.
+        """
+        if response.status_code != 200:
+            error = {
+                "index": index,
+                "status_code": response.status_code,
+                "message": cls._extract_error_message(response),
+            }
+            if response.status_code in RETRY_STATUS_CODES:
+                error["retryable"] = True
+            return error
+        try:
+            result = response.json()
+        except ValueError:
+            result = None
+        if not isinstance(result, dict):
+            return {
+                "index": index,
+                "status_code": response.status_code,
+                "message": "Invalid JSON response from server.",
+            }
+        return {"index": index, **result}
+
     @staticmethod
     def _extract_error_message(response: requests.Response) -> str:
         try:
@@ -87,63 +206,316 @@ class DecimerAPI:
 
         return "Unknown server error"
 
-    def _prepare_request_data(
-        self,
-        input_image: Path | str,
-        hand_drawn: bool,
-        classify_image: bool,
-    ) -> dict[str, str] | None:
+    def _compact_image(self, image_bytes: bytes) -> bytes:
+        """Downscales an image to max_side and re-encodes it as grayscale PNG.
+
+        Transparent areas are flattened onto white first. The original bytes are
+        kept when they are already smaller than the re-encoded image.
+        Raises ValueError for images PIL refuses to decode as decompression bombs.
+        """
+        try:
+            with Image.open(io.BytesIO(image_bytes)) as image:
+                image = image.convert("RGBA")
+        except Image.DecompressionBombError as exc:
+            raise ValueError(f"Image is too large to downscale: {exc}") from exc
+        background = Image.new("RGBA", image.size, "white")
+        image = Image.alpha_composite(background, image).convert("L")
+        image.thumbnail((self.max_side, self.max_side), Image.LANCZOS)
+
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG", optimize=True)
+        compacted = buffer.getvalue()
+        return compacted if len(compacted) < len(image_bytes) else image_bytes
+
+    def _load_image_bytes(self, input_image: Path | str) -> bytes:
+        """Reads and validates an image file, converting EMF to PNG if needed.
+
+        With max_side set, the image is downscaled and re-encoded before upload,
+        and the size limit applies to the re-encoded image.
+        Raises ValueError for images the server would reject.
+        """
         if isinstance(input_image, str):
             input_image = Path(input_image)
 
-        if input_image.stat().st_size > 4 * 1024 * 1024:
-            print("Error: Image file size is too large.")
-            return None
+        if self.max_side is None and input_image.stat().st_size > MAX_IMAGE_BYTES:
+            raise ValueError("Image file size is too large.")
 
-        encoded_image = base64.b64encode(input_image.read_bytes()).decode("utf-8")
+        image_bytes = input_image.read_bytes()
 
-        is_emf, is_valid_image = self._is_valid_image_type(encoded_image)
+        is_emf, is_valid_image = self._detect_image_type(image_bytes)
 
         if not is_valid_image:
-            print(
-                "Error: Invalid image type. Only JPG, PNG, GIF and EMF are supported."
+            raise ValueError(
+                "Invalid image type. Only JPG, PNG, GIF and EMF are supported."
             )
-            return None
 
         if is_emf:
-            new_input_image = self._convert_emf2png(input_image)
-            encoded_image = base64.b64encode(new_input_image.read_bytes()).decode(
-                "utf-8"
-            )
+            image_bytes = self._convert_emf2png(input_image).read_bytes()
+
+        if self.max_side is not None:
+            image_bytes = self._compact_image(image_bytes)
+            if len(image_bytes) > MAX_IMAGE_BYTES:
+                raise ValueError("Image file size is too large.")
+
+        return image_bytes
+
+    def _read_image_bytes(self, input_image: Path | str) -> bytes | None:
+        """Reads and validates an image file; prints the reason and returns None if invalid."""
+        try:
+            return self._load_image_bytes(input_image)
+        except ValueError as exc:
+            print(f"Error: {exc}")
+            return None
+
+    def _prepare_request_data(
+        self,
+        input_image: Path | str,
+        hand_drawn: bool,
+        classify_image: bool,
+    ) -> dict[str, str] | None:
+        image_bytes = self._read_image_bytes(input_image)
+        if image_bytes is None:
+            return None
 
+        return self._encode_request_data(image_bytes, hand_drawn, classify_image)
+
+    @staticmethod
+    def _encode_request_data(
+        image_bytes: bytes, hand_drawn: bool, classify_image: bool
+    ) -> dict[str, str]:
         return {
-            "encoded_image": encoded_image,
+            "encoded_image": base64.b64encode(image_bytes).decode("utf-8"),
             "is_hand_drawn": str(hand_drawn).lower(),
             "classify_image": str(classify_image).lower(),
         }
 
-    def _post_image2smiles(self, data: dict[str, str]) -> dict[str, Any] | None:
-        response = requests.post(f"{self.DECIMER_URL}/image2smiles/", data=data)
+    def _convert_emf2png(self, input_path: Path) -> Path:
+        """Converts an EMF file to PNG using Inkscape.
+
+        The PNG is written to the converter's cache directory, never next to the source.
+        """
+        if self.emf_converter is None:
+            self.emf_converter = EmfConverter()
+        return self.emf_converter.convert(input_path)
+
+
+class DecimerAPI(_ImagePayloads):
+    """
+    DecimerAPI class for interacting with the DECIMER image-to-SMILES server.
+
+    Attributes:
+        DECIMER_URL (str): The URL of the DECIMER API endpoint.
+
+    Methods:
+        __init__(host: str = "localhost", port: int = 8099, binary_upload: bool | None = None, pool_size: int = 10, timeout: float | tuple[float, float] = (5.0, 300.0), retries: int = 3, backoff_factor: float = 0.5, emf_cache_dir: Path | str | None = None, emf_workers: int = 2, max_side: int | None = None, priority: str | None = None):
+            Initializes the DecimerAPI instance with the specified host and port, defaulting to localhost 8099.
+            Raw binary uploads are used automatically when the server supports them.
+            Can be used as a context manager; close() releases the pooled connections.
+
+        _is_valid_image_type(encoded_image: bytes) -> bool:
+            Checks if the base64-encoded image is of type JPG, PNG, GIF, EMF.
+
+        _convert_emf2png(input_path: Path) -> Path:
+            Converts an EMF file to PNG using Inkscape, cached by content hash.
+
+        call_image2smiles(input_image: Path | str, hand_drawn: bool = False, classify_image: bool = True) -> str | None:
+            Calls the DECIMER API and returns only the SMILES value (backwards compatible behavior).
+
+        call_image2smiles_with_meta(input_image: Path | str, hand_drawn: bool = False, classify_image: bool = True, server_timing: bool = False) -> dict[str, Any] | None:
+            Calls the DECIMER API and returns the full response JSON, including metadata fields
+            and, when requested, the server-side stage timings.
+
+        call_image2smiles_batch(input_images: Iterable[Path | str], hand_drawn: bool = False, classify_image: bool = True, chunk_size: int = 256) -> Iterator[dict[str, Any]]:
+            Sends many images in requests of up to chunk_size and yields the per-image results as the server streams them.
+
+        call_image2smiles_many(input_images: Iterable[Path | str], concurrency: int = 8, hand_drawn: bool = False, classify_image: bool = True, ordered: bool = True) -> Iterator[dict[str, Any]]:
+            Converts many images with a bounded number of concurrent requests, yielding per-image results or errors.
+
+        submit_job(input_images: Iterable[Path | str], hand_drawn: bool = False, classify_image: bool = True, chunk_size: int = 256) -> str | None:
+            Queues many images as a server-side job and returns the job id; raises
+            JobSubmitError (with the job id) when a later upload fails.
+
+        get_job(job_id: str) -> dict[str, Any] | None / cancel_job(job_id: str) -> dict[str, Any] | None:
+            Return the job status (state and item counts), cancelling its queued images first for cancel_job.
+
+        wait_job(job_id: str, poll_interval: float = 2.0, timeout: float | None = None) -> dict[str, Any] | None:
+            Polls a job until it is completed or cancelled.
+
+        iter_job_results(job_id: str, page_size: int = 100, wait: bool = True, poll_interval: float = 2.0) -> Iterator[dict[str, Any]]:
+            Yields the per-image results of a job page by page as they finish.
+
+        server_status() -> str:
+            Returns a simple status string based on the server root endpoint response, including whether the models are still loading.
+
+        get_system_status() -> dict[str, Any] | None:
+            Retrieve system status including hardware acceleration information (CPU/CUDA/Metal).
+    """
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 8099,
+        binary_upload: bool | None = None,
+        pool_size: int = 10,
+        timeout: float | tuple[float, float] = (5.0, 300.0),
+        retries: int = 3,
+        backoff_factor: float = 0.5,
+        emf_cache_dir: Path | str | None = None,
+        emf_workers: int = 2,
+        max_side: int | None = None,
+        priority: str | None = None,
+    ):
+        """
+        Args:
+            host: server host name or IP address
+            port: server port
+            binary_upload: send raw image bytes instead of base64 form fields.
+                None (default) uses binary uploads when the server advertises support.
+            pool_size: max number of kept-alive connections to the server
+            timeout: seconds to wait for the connection and for the response,
+                either one value for both or a (connect, read) tuple
+            retries: retries on connection errors and 429/502/503/504 responses.
+                Conversions have no side effects, so POST requests are retried too.
+            backoff_factor: exponential backoff between retries
+                (backoff_factor * 2 ** (retry - 1) seconds); a Retry-After header wins.
+            emf_cache_dir: directory for the PNGs rendered from EMF files
+                (default: ~/.cache/decimerapi/emf)
+            emf_workers: number of Inkscape processes converting EMF files in parallel
+            max_side: downscale images so that neither side exceeds max_side pixels and
+                upload them as grayscale PNG (requires Pillow). None (default) sends the
+                files unchanged. DECIMER works on 512 x 512 pixels, so 1024 is a safe value.
+            priority: server-side priority lane of every request, "interactive" or
+                "bulk"; None (default) leaves the choice to the server.
+        """
+        self._check_downscale_support(max_side)
+        self.DECIMER_URL = f"http://{host}:{port}"
+        self.binary_upload = binary_upload
+        self.timeout = timeout
+        self.emf_converter = EmfConverter(emf_cache_dir, emf_workers)
+        self.max_side = max_side
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=None,  # retry every method, including POST
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=pool_size, max_retries=retry
+        )
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if priority is not None:
+            self.session.headers["X-Priority"] = priority
+
+    def __enter__(self) -> "DecimerAPI":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Closes the pooled connections to the server."""
+        self.session.close()
+
+    def _uses_binary_upload(self) -> bool:
+        """Resolves binary upload support, asking the server when not configured.
+
+        Only an answer of the server is kept: while it cannot be reached, base64
+        uploads are used and the next call asks again.
+        """
+        if self.binary_upload is None:
+            status = self._fetch_system_status()
+            if not isinstance(status, dict):
+                return False
+            self.binary_upload = "binary_upload" in status.get("features", [])
+        return self.binary_upload
+
+    def _request_image2smiles(
+        self,
+        input_image: Path | str,
+        hand_drawn: bool,
+        classify_image: bool,
+        server_timing: bool = False,
+    ) -> dict[str, Any] | None:
+        headers = {"X-Server-Timing": "true"} if server_timing else {}
+        if not self._uses_binary_upload():
+            data = self._prepare_request_data(input_image, hand_drawn, classify_image)
+            if data is None:
+                return None
+            return self._post_image2smiles(data, headers)
+
+        image_bytes = self._read_image_bytes(input_image)
+        if image_bytes is None:
+            return None
+        return self._post_image2smiles_binary(
+            image_bytes, hand_drawn, classify_image, headers
+        )
+
+    def _handle_image2smiles_response(
+        self, response: requests.Response
+    ) -> dict[str, Any] | None:
         if response.status_code != 200:
             error_message = self._extract_error_message(response)
             print(f"Error: {response.status_code} - {error_message}")
             return None
 
-        return response.json()
+        result = response.json()
+        if "Server-Timing" in response.headers:
+            result["server_timing"] = self._parse_server_timing(
+                response.headers["Server-Timing"]
+            )
+        return result
 
-    def _convert_emf2png(self, input_path: Path) -> Path:
-        """Converts an EMF file to PNG using Inkscape."""
-        output_path = input_path.with_suffix(".png")
-        subprocess.run(
-            [
-                "inkscape",
-                str(input_path),
-                f"--export-filename={str(output_path)}",
-                "--export-type=png",
-            ],
-            check=True,
+    def _post_image2smiles(
+        self, data: dict[str, str], headers: dict[str, str] | None = None
+    ) -> dict[str, Any] | None:
+        return self._handle_image2smiles_response(
+            self._send_image2smiles(data, headers)
+        )
+
+    def _post_image2smiles_binary(
+        self,
+        image_bytes: bytes,
+        hand_drawn: bool,
+        classify_image: bool,
+        headers: dict[str, str] | None = None,
+    ) -> dict[str, Any] | None:
+        return self._handle_image2smiles_response(
+            self._send_image2smiles_binary(
+                image_bytes, hand_drawn, classify_image, headers
+            )
+        )
+
+    def _send_image2smiles(
+        self, data: dict[str, str], headers: dict[str, str] | None = None
+    ) -> requests.Response:
+        return self.session.post(
+            f"{self.DECIMER_URL}/image2smiles/",
+            data=data,
+            headers=headers,
+            timeout=self.timeout,
+        )
+
+    def _send_image2smiles_binary(
+        self,
+        image_bytes: bytes,
+        hand_drawn: bool,
+        classify_image: bool,
+        headers: dict[str, str] | None = None,
+    ) -> requests.Response:
+        return self.session.post(
+            f"{self.DECIMER_URL}/image2smiles/",
+            data=image_bytes,
+            params={
+                "is_hand_drawn": str(hand_drawn).lower(),
+                "classify_image": str(classify_image).lower(),
+            },
+            headers={"Content-Type": "application/octet-stream", **(headers or {})},
+            timeout=self.timeout,
         )
-        return output_path
 
     def call_image2smiles(
         self,
@@ -160,11 +532,9 @@ class DecimerAPI:
             hand_drawn: Boolean indicating if the image is hand-drawn
             classify_image: Boolean indicating if the image should be classified
         """
-        data = self._prepare_request_data(input_image, hand_drawn, classify_image)
-        if data is None:
-            return None
-
-        response_json = self._post_image2smiles(data)
+        response_json = self._request_image2smiles(
+            input_image, hand_drawn, classify_image
+        )
         if response_json is None:
             return None
 
@@ -176,34 +546,321 @@ class DecimerAPI:
         input_image: Path | str,
         hand_drawn: bool = False,
         classify_image: bool = True,
+        server_timing: bool = False,
     ) -> dict[str, Any] | None:
         """Calls DECIMER server and returns the full response payload.
 
         Keeps parity with server metadata fields while preserving `call_image2smiles`
         for backwards-compatible smiles-only usage.
+        With `server_timing=True` (or when the server samples the request) the result
+        also carries `server_timing`: {stage: duration in milliseconds}.
+        """
+        return self._request_image2smiles(
+            input_image, hand_drawn, classify_image, server_timing
+        )
+
+    def call_image2smiles_batch(
+        self,
+        input_images: Iterable[Path | str],
+        hand_drawn: bool = False,
+        classify_image: bool = True,
+        chunk_size: int = 256,
+    ) -> Iterator[dict[str, Any]]:
+        """Sends many images to the batch endpoint and yields results as they complete.
+
+        Every yielded dict carries `index` (position in `input_images`) plus the
+        regular response fields, or `status_code`/`message` for failed items.
+        Results arrive in completion order within each request, not input order.
+        Images are read lazily and sent in requests of at most `chunk_size` (keep it
+        at or below the server's DECIMER_BATCH_MAX_ITEMS), so memory use is bounded
+        by one chunk. Images rejected locally (unreadable, size/type) are yielded with
+        `status_code` None; when a whole request fails, each of its images is
+        yielded with the request's status code (None for connection errors).
+        """
+        items = []
+        positions = []
+        for index, input_image in enumerate(input_images):
+            try:
+                image_bytes = self._load_image_bytes(input_image)
+            except (OSError, ValueError) as exc:
+                yield {"index": index, "status_code": None, "message": str(exc)}
+                continue
+            items.append(
+                self._encode_request_data(image_bytes, hand_drawn, classify_image)
+            )
+            positions.append(index)
+            if len(items) >= chunk_size:
+                yield from self._post_batch(items, positions)
+                items, positions = [], []
+
+        if items:
+            yield from self._post_batch(items, positions)
+
+    def _post_batch(
+        self, items: list[dict[str, str]], positions: list[int]
+    ) -> Iterator[dict[str, Any]]:
+        """Posts one batch request; errors are yielded per item, never printed."""
+        answered = set()
+        try:
+            with self.session.post(
+                f"{self.DECIMER_URL}/image2smiles/batch",
+                json={"items": items},
+                stream=True,
+                timeout=self.timeout,
+            ) as response:
+                if response.status_code != 200:
+                    error_message = self._extract_error_message(response)
+                    for position in positions:
+                        yield {
+                            "index": position,
+                            "status_code": response.status_code,
+                            "message": error_message,
+                        }
+                    return
+
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    result = json.loads(line)
+                    answered.add(result["index"])
+                    result["index"] = positions[result["index"]]
+                    yield result
+        except requests.exceptions.RequestException as exc:
+            for item_index, position in enumerate(positions):
+                if item_index not in answered:
+                    yield {"index": position, "status_code": None, "message": str(exc)}
+
+    def _convert_one(
+        self,
+        index: int,
+        input_image: Path | str,
+        hand_drawn: bool,
+        classify_image: bool,
+        binary_upload: bool,
+    ) -> dict[str, Any]:
+        """Reads, encodes and converts one image; errors are returned, not printed."""
+        try:
+            image_bytes = self._load_image_bytes(input_image)
+            if binary_upload:
+                response = self._send_image2smiles_binary(
+                    image_bytes, hand_drawn, classify_image
+                )
+            else:
+                response = self._send_image2smiles(
+                    self._encode_request_data(image_bytes, hand_drawn, classify_image)
+                )
+        except requests.exceptions.RequestException as exc:
+            return {
+                "index": index,
+                "status_code": None,
+                "message": str(exc),
+                "retryable": True,
+            }
+        except (OSError, ValueError) as exc:
+            return {"index": index, "status_code": None, "message": str(exc)}
+        return self._response_result(index, response)
+
+    def call_image2smiles_many(
+        self,
+        input_images: Iterable[Path | str],
+        concurrency: int = 8,
+        hand_drawn: bool = False,
+        classify_image: bool = True,
+        ordered: bool = True,
+    ) -> Iterator[dict[str, Any]]:
+        """Converts many images, keeping up to `concurrency` requests in flight.
+
+        Images are read, validated and encoded on the worker threads that send them,
+        so payload preparation overlaps with the requests of other images.
+        Every yielded dict carries `index` (position in `input_images`) plus the
+        regular response fields, or `status_code`/`message` for failed items
+        (`status_code` None for local errors such as unreadable files, rejected
+        images or connection failures).
+        Results are yielded in input order, or as they complete with `ordered=False`.
+        For best results keep `concurrency` at or below the client's `pool_size`.
+        EMF files (by suffix) are converted ahead of the requests in parallel batches.
+        """
+        binary_upload = self._uses_binary_upload()
+        if INKSCAPE:
+            input_images = self.emf_converter.prefetch(input_images)
+
+        def convert(item: tuple[int, Path | str]) -> dict[str, Any]:
+            index, input_image = item
+            return self._convert_one(
+                index, input_image, hand_drawn, classify_image, binary_upload
+            )
+
+        yield from _map_concurrently(
+            convert, enumerate(input_images), concurrency, ordered
+        )
+
+    def _job_request(
+        self, method: str, path: str, **kwargs: Any
+    ) -> dict[str, Any] | None:
+        """Calls a /jobs endpoint; prints the server's error and returns None on failure."""
+        response = self.session.request(
+            method, f"{self.DECIMER_URL}{path}", timeout=self.timeout, **kwargs
+        )
+        if response.status_code not in (200, 202):
+            error_message = self._extract_error_message(response)
+            print(f"Error: {response.status_code} - {error_message}")
+            return None
+        return response.json()
+
+    def submit_job(
+        self,
+        input_images: Iterable[Path | str],
+        hand_drawn: bool = False,
+        classify_image: bool = True,
+        chunk_size: int = 256,
+    ) -> str | None:
+        """Queues many images for background conversion on the server; returns the job id.
+
+        The server stores the job on disk and converts it at full model throughput,
+        independent of this client: poll it with get_job/wait_job and read the
+        results with iter_job_results, also from another process or after a restart.
+        Images are uploaded in requests of `chunk_size` (at most the server's
+        DECIMER_BATCH_MAX_ITEMS). Every image is submitted with its path as `name`;
+        images rejected locally (unreadable, size/type) are reported and skipped,
+        so the job `index` counts submitted images only.
+        Returns None when the server rejects the job or no image could be submitted.
+        Raises JobSubmitError, which carries the job id, when a later upload fails
+        after the job was created.
         """
-        data = self._prepare_request_data(input_image, hand_drawn, classify_image)
-        if data is None:
+        if INKSCAPE:
+            input_images = self.emf_converter.prefetch(input_images)
+
+        job_id = None
+        submitted = 0
+        items = []
+
+        def send() -> bool:
+            nonlocal job_id, submitted
+            path = "/jobs" if job_id is None else f"/jobs/{job_id}/items"
+            # POSTs are retried by the session; the key lets the server store
+            # a retried request only once.
+            status = self._job_request(
+                "POST",
+                path,
+                headers={"Idempotency-Key": uuid.uuid4().hex},
+                json={
+                    "items": items,
+                    "is_hand_drawn": hand_drawn,
+                    "classify_image": classify_image,
+                },
+            )
+            if status is None:
+                if job_id is not None:
+                    raise JobSubmitError(
+                        job_id,
+                        submitted,
+                        f"Job {job_id} holds only the {submitted} images submitted "
+                        "before the upload failed.",
+                    )
+                return False
+            job_id = status["job_id"]
+            submitted += len(items)
+            items.clear()
+            return True
+
+        for input_image in input_images:
+            try:
+                image_bytes = self._load_image_bytes(input_image)
+            except (OSError, ValueError) as exc:
+                print(f"Error: {input_image}: {exc}")
+                continue
+            items.append(
+                {
+                    "name": str(input_image),
+                    "encoded_image": base64.b64encode(image_bytes).decode("utf-8"),
+                }
+            )
+            if len(items) >= chunk_size and not send():
+                return None
+
+        if items and not send():
             return None
+        if job_id is None:
+            print("Error: no valid images to submit.")
+        return job_id
 
-        return self._post_image2smiles(data)
+    def get_job(self, job_id: str) -> dict[str, Any] | None:
+        """Returns the job status: `state` (queued, running, completed, cancelled) and item counts."""
+        return self._job_request("GET", f"/jobs/{job_id}")
+
+    def wait_job(
+        self,
+        job_id: str,
+        poll_interval: float = 2.0,
+        timeout: float | None = None,
+    ) -> dict[str, Any] | None:
+        """Polls a job until it is completed or cancelled and returns its final status.
+
+        Raises TimeoutError when `timeout` seconds pass first; returns None if the
+        job is unknown to the server.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            status = self.get_job(job_id)
+            if status is None or status["state"] in ("completed", "cancelled"):
+                return status
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError(f"Job {job_id} is still {status['state']}.")
+            time.sleep(poll_interval)
+
+    def iter_job_results(
+        self,
+        job_id: str,
+        page_size: int = 100,
+        wait: bool = True,
+        poll_interval: float = 2.0,
+    ) -> Iterator[dict[str, Any]]:
+        """Yields the results of a job page by page, in completion order.
+
+        Every result carries `index` and `name` of the submitted image plus the
+        regular response fields, or `status_code`/`message` for failed items.
+        With `wait` (default) results are yielded as they finish until the job is
+        completed or cancelled; otherwise only the results available now.
+        """
+        cursor = 0
+        while True:
+            page = self._job_request(
+                "GET",
+                f"/jobs/{job_id}/results",
+                params={"cursor": cursor, "limit": page_size},
+            )
+            if page is None:
+                return
+            yield from page["results"]
+            cursor = page["next_cursor"]
+            if len(page["results"]) == page_size:
+                continue
+            if not wait or page["state"] in ("completed", "cancelled"):
+                return
+            time.sleep(poll_interval)
+
+    def cancel_job(self, job_id: str) -> dict[str, Any] | None:
+        """Cancels the queued images of a job and returns its status."""
+        return self._job_request("POST", f"/jobs/{job_id}/cancel")
 
     def server_status(self) -> str:
-        """Check the status of the DECIMER server."""
-        response = requests.get(self.DECIMER_URL)
-        if response.status_code == 200:
-            return "Server is running."
-        else:
-            return "Server is not running."
+        """Check the status of the DECIMER server.
+
+        "Server is running." only once the models are loaded; a server that
+        answers but is still loading them reports so.
+        """
+        response = self.session.get(self.DECIMER_URL, timeout=self.timeout)
+        return self._status_message(response)
 
     def get_system_status(self) -> dict[str, Any] | None:
         """Retrieve system status including hardware acceleration information.
 
         Returns:
             dict with keys:
-                - 'status' (str): Server status (e.g., 'ready')
+                - 'status' (str): Server status ('loading', 'ready' or 'failed')
                 - 'accelerator_type' (str): One of 'cpu', 'cuda', 'metal'
                 - 'tensorflow_version' (str): TensorFlow version
+                - 'features' (list[str]): optional server capabilities, e.g. 'binary_upload'
 
             Returns None if server is unreachable or returns invalid response.
 
@@ -214,7 +871,9 @@ class DecimerAPI:
             ...     print(f"GPU available: {status['accelerator_type']}")
         """
         try:
-            response = requests.get(f"{self.DECIMER_URL}/system/status")
+            response = self.session.get(
+                f"{self.DECIMER_URL}/system/status", timeout=self.timeout
+            )
             if response.status_code != 200:
                 print(f"Error: Server returned status code {response.status_code}")
                 return None
@@ -223,3 +882,18 @@ class DecimerAPI:
         except requests.exceptions.RequestException as e:
             print(f"Error connecting to DECIMER server: {e}")
             return None
+
+    def _fetch_system_status(self) -> dict[str, Any] | None:
+        """Silent variant of get_system_status used for feature detection."""
+        try:
+            response = self.session.get(
+                f"{self.DECIMER_URL}/system/status", timeout=self.timeout
+            )
+        except requests.exceptions.RequestException:
+            return None
+        if response.status_code != 200:
+            return None
+        try:
+            return response.json()
+        except ValueError:
+            return None
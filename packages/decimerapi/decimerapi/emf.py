@@ -0,0 +1,235 @@
+"""
+module: emf.py
+
+license: MIT
+Batched, parallel and cached EMF to PNG conversion with Inkscape.
+
+Starting Inkscape takes seconds, so EMFs are rendered in groups: one Inkscape invocation
+per group (using --actions, Inkscape 1.2+), with several groups running in parallel.
+Rendered PNGs are stored in a cache directory under the SHA-256 of the EMF content,
+so the same EMF is never rendered twice and read-only input directories work. The
+least recently used PNGs are removed once the directory outgrows max_cache_bytes.
+"""
+
+import hashlib
+import os
+import subprocess
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from pathlib import Path
+
+
+def _default_cache_dir() -> Path:
+    cache_home = os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "decimerapi" / "emf"
+
+
+class EmfConverter:
+    """Converts EMF files to PNG files in a content-addressed cache directory."""
+
+    def __init__(
+        self,
+        cache_dir: Path | str | None = None,
+        workers: int = 2,
+        group_size: int = 16,
+        max_cache_bytes: int | None = 1024**3,
+        timeout: float | None = 120,
+    ):
+        """
+        Args:
+            cache_dir: where rendered PNGs are kept (default: ~/.cache/decimerapi/emf)
+            workers: number of Inkscape processes running at the same time
+            group_size: max number of EMFs rendered by one Inkscape invocation
+            max_cache_bytes: size above which the least recently used PNGs are
+                deleted after a conversion (default 1 GiB); None keeps them all.
+                PNGs used within the last hour are kept either way, so that
+                prefetched files are not removed before they are read.
+            timeout: seconds Inkscape may spend per EMF before it is killed and
+                the render counts as failed (default 120); None waits forever.
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else _default_cache_dir()
+        self.workers = workers
+        self.group_size = group_size
+        self.max_cache_bytes = max_cache_bytes
+        self.timeout = timeout
+
+    @staticmethod
+    def _digest(emf_path: Path) -> str:
+        return hashlib.sha256(emf_path.read_bytes()).hexdigest()
+
+    def _cached_path(self, digest: str) -> Path:
+        return self.cache_dir / f"{digest}.png"
+
+    def _partial_path(self, digest: str) -> Path:
+        # Unique per thread, so concurrent renders of the same EMF do not collide.
+        return self.cache_dir / (
+            f"{digest}.partial-{os.getpid()}-{threading.get_ident()}.png"
+        )
+
+    def _run_inkscape(self, arguments: list[str], emf_count: int) -> bool:
+        """Runs Inkscape; returns False if it was killed after the timeout."""
+        timeout = None if self.timeout is None else self.timeout * emf_count
+        try:
+            subprocess.run(
+                ["inkscape", *arguments], capture_output=True, timeout=timeout
+            )
+        except subprocess.TimeoutExpired:
+            return False
+        return True
+
+    def _render_one(self, digest: str, source: Path) -> None:
+        """Renders one EMF with the classic command line (any Inkscape 1.x)."""
+        partial = self._partial_path(digest)
+        finished = self._run_inkscape(
+            [str(source), f"--export-filename={partial}", "--export-type=png"], 1
+        )
+        if not finished:
+            # The PNG may be cut off; the EMF is reported as not convertible.
+            partial.unlink(missing_ok=True)
+        elif partial.exists():
+            os.replace(partial, self._cached_path(digest))
+
+    def _render_group(self, group: list[tuple[str, Path]]) -> None:
+        """Renders a group of EMFs with a single Inkscape invocation."""
+        actions = []
+        for digest, source in group:
+            actions += [
+                f"file-open:{source}",
+                f"export-filename:{self._partial_path(digest)}",
+                "export-do",
+                "file-close",
+            ]
+        if len(group) > 1 and not self._run_inkscape(
+            [f"--actions={';'.join(actions)}"], len(group)
+        ):
+            # Any of the PNGs may be cut off; render the files one by one instead.
+            for digest, _ in group:
+                self._partial_path(digest).unlink(missing_ok=True)
+        for digest, source in group:
+            partial = self._partial_path(digest)
+            if partial.exists():
+                os.replace(partial, self._cached_path(digest))
+            else:
+                # Single file, older Inkscape without export-do, or a failed group.
+                self._render_one(digest, source)
+
+    def convert_many(self, emf_paths: Iterable[Path | str]) -> dict[Path, Path | Exception]:
+        """Converts EMF files, rendering only those not cached yet.
+
+        Returns {emf_path: png_path} with an exception instead of the PNG path for
+        files that could not be read or rendered.
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        digests: dict[Path, str | Exception] = {}
+        misses: dict[str, Path] = {}
+        for emf_path in map(Path, emf_paths):
+            try:
+                digest = self._digest(emf_path)
+            except OSError as exc:
+                digests[emf_path] = exc
+                continue
+            digests[emf_path] = digest
+            if not self._cached_path(digest).exists():
+                misses.setdefault(digest, emf_path)
+                continue
+            try:
+                # The modification time records the last use, see _evict.
+                os.utime(self._cached_path(digest))
+            except OSError:
+                pass
+
+        renders = list(misses.items())
+        # Paths containing ';' cannot be passed as an action argument.
+        singles = [(digest, path) for digest, path in renders if ";" in str(path)]
+        grouped = [(digest, path) for digest, path in renders if ";" not in str(path)]
+        groups = [
+            grouped[start : start + self.group_size]
+            for start in range(0, len(grouped), self.group_size)
+        ] + [[single] for single in singles]
+        if groups:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                list(executor.map(self._render_group, groups))
+            self._evict()
+
+        results: dict[Path, Path | Exception] = {}
+        for emf_path, digest in digests.items():
+            if isinstance(digest, Exception):
+                results[emf_path] = digest
+            elif self._cached_path(digest).exists():
+                results[emf_path] = self._cached_path(digest)
+            else:
+                results[emf_path] = ValueError(f"EMF conversion failed: {emf_path}")
+        return results
+
+    def _evict(self, keep_seconds: float = 3600) -> None:
+        """Deletes the least recently used PNGs while the cache exceeds max_cache_bytes.
+
+        Files used within keep_seconds stay, as do files other processes remove
+        first. Leftover partial renders older than that are deleted as well.
+        """
+        if self.max_cache_bytes is None:
+            return
+        cutoff = time.time() - keep_seconds
+        entries = []
+        for path in self.cache_dir.glob("*.png"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if ".partial-" in path.name:
+                if stat.st_mtime < cutoff:
+                    path.unlink(missing_ok=True)
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for mtime, size, path in sorted(entries):
+            if total <= self.max_cache_bytes or mtime >= cutoff:
+                break
+            try:
+                path.unlink(missing_ok=True)
+            except OSError:
+                continue
+            total -= size
+
+    def convert(self, emf_path: Path | str) -> Path:
+        """Converts one EMF file and returns the path of the PNG in the cache."""
+        result = self.convert_many([emf_path])[Path(emf_path)]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def prefetch(
+        self, input_images: Iterable[Path | str], chunk_size: int = 64
+    ) -> Iterator[Path | str]:
+        """Passes input_images through, converting the EMFs of each chunk ahead of time.
+
+        While one chunk is being consumed, the EMF files (by suffix) of the next
+        chunk are rendered in the background, so later reads hit the cache.
+        """
+        input_images = iter(input_images)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            pending = None
+            while chunk := list(islice(input_images, chunk_size)):
+                future = executor.submit(self._prefetch_chunk, chunk)
+                if pending is not None:
+                    yield from pending.result()
+                pending = future
+            if pending is not None:
+                yield from pending.result()
+
+    def _prefetch_chunk(self, chunk: list[Path | str]) -> list[Path | str]:
+        emf_paths = [path for path in chunk if str(path).lower().endswith(".emf")]
+        if emf_paths:
+            # Best effort: a failing conversion (no Inkscape, unwritable cache
+            # directory, ...) must not end the iteration. Every image is read
+            # later on its own, which converts it again and reports the error
+            # for that image only.
+            try:
+                self.convert_many(emf_paths)
+            except Exception:
+                pass
+        return chunk
@@ -0,0 +1,295 @@
+"""
+module: ingest.py
+
+license: MIT
+Resumable bulk conversion of a directory tree or a manifest of image paths into a JSONL file.
+
+Images are streamed lazily through read -> validate -> upload on a bounded pool of
+worker threads, with EMF files converted ahead in parallel batches, and every result is
+appended to the output as one JSON line as soon as it is in order. Since the output
+follows the input order, a restarted run skips the items already recorded by reading
+input and output side by side, without holding either in memory. Items whose record is
+marked retryable (connection errors, server busy) are converted again. A live report of
+images/s, p95 latency and error rate is printed to stderr.
+
+Usage:
+    python -m decimerapi.ingest figures/ results.jsonl --concurrency 16
+    decimer-ingest manifest.txt results.jsonl --host 192.168.1.10
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from pathlib import Path
+from typing import Any
+
+from .decimerapi import INKSCAPE, DecimerAPI, _map_concurrently
+
+IMAGE_SUFFIXES = (".png", ".jpg", ".jpeg", ".gif", ".emf")
+
+
+def iter_directory(root: Path | str) -> Iterator[Path]:
+    """Yields the image files below root in a stable (sorted) order, one directory at a time."""
+    with os.scandir(root) as scanner:
+        entries = sorted(scanner, key=lambda entry: entry.name)
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            yield from iter_directory(entry.path)
+        elif entry.is_file() and entry.name.lower().endswith(IMAGE_SUFFIXES):
+            yield Path(entry.path)
+
+
+def iter_manifest(manifest: Path | str) -> Iterator[Path]:
+    """Yields the image paths listed in a manifest file, one per line.
+
+    Relative paths are resolved against the manifest's directory; blank lines and
+    lines starting with # are ignored.
+    """
+    manifest = Path(manifest)
+    with open(manifest, encoding="utf-8") as handle:
+        for line in handle:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield manifest.parent / line
+
+
+def iter_source(source: Path | str) -> Iterator[Path]:
+    """Yields the images of a directory tree, or of a manifest file."""
+    if Path(source).is_dir():
+        return iter_directory(source)
+    return iter_manifest(source)
+
+
+class IngestStats:
+    """Running totals plus a rolling window of recent results for the live report."""
+
+    def __init__(self, window: int = 1000):
+        self.processed = 0
+        self.errors = 0
+        self.skipped = 0
+        self._recent: deque = deque(maxlen=window)  # (finished_at, seconds, failed)
+
+    def record(self, seconds: float, failed: bool) -> None:
+        self.processed += 1
+        self.errors += failed
+        self._recent.append((time.monotonic(), seconds, failed))
+
+    @property
+    def images_per_second(self) -> float:
+        if len(self._recent) < 2:
+            return 0.0
+        elapsed = self._recent[-1][0] - self._recent[0][0]
+        return (len(self._recent) - 1) / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def p95_seconds(self) -> float:
+        if not self._recent:
+            return 0.0
+        latencies = sorted(seconds for _, seconds, _ in self._recent)
+        return latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+
+    @property
+    def error_rate(self) -> float:
+        if not self._recent:
+            return 0.0
+        return sum(failed for _, _, failed in self._recent) / len(self._recent)
+
+    def summary(self) -> str:
+        return (
+            f"{self.processed} converted ({self.errors} failed), "
+            f"{self.skipped} skipped | {self.images_per_second:.1f} images/s | "
+            f"p95 {self.p95_seconds:.2f} s | errors {self.error_rate:.1%}"
+        )
+
+
+def _completed_size(output: Path) -> int:
+    """Drops a partially written last line left by an interrupted run.
+
+    Returns the size of the complete records in the output file.
+    """
+    if not output.exists():
+        return 0
+    with open(output, "rb+") as handle:
+        data_end = handle.seek(0, os.SEEK_END)
+        position = data_end
+        while position > 0:
+            step = min(65536, position)
+            handle.seek(position - step)
+            chunk = handle.read(step)
+            newline = chunk.rfind(b"\n")
+            if newline != -1:
+                position = position - step + newline + 1
+                break
+            position -= step
+        if position != data_end:
+            handle.truncate(position)
+        return position
+
+
+def _skip_completed(
+    inputs: Iterable[Path], output: Path, end: int, stats: IngestStats
+) -> Iterator[Path]:
+    """Yields the inputs without a final record among the first `end` bytes of output.
+
+    Records marked `retryable` (connection errors, 429/502/503/504) are not final:
+    their inputs are converted again and get a new record appended.
+    """
+    inputs = iter(inputs)
+    if end == 0:
+        yield from inputs
+        return
+
+    def recorded_inputs(handle) -> Iterator[tuple[str | None, bool]]:
+        while handle.tell() < end:
+            try:
+                record = json.loads(handle.readline())
+                yield record["input"], bool(record.get("retryable"))
+            except (ValueError, KeyError, TypeError, AttributeError):
+                yield None, False
+
+    with open(output, "rb") as handle:
+        recorded = recorded_inputs(handle)
+        for recorded_input, retryable in recorded:
+            input_path = next(inputs, None)
+            if input_path is None:
+                return
+            if str(input_path) == recorded_input and not retryable:
+                stats.skipped += 1
+                continue
+            # The corpus changed since the last run, or items are to be retried
+            # (their new records follow later); look up the remaining records.
+            done = {
+                recorded_input
+                for recorded_input, retryable in itertools.chain(
+                    [(recorded_input, retryable)], recorded
+                )
+                if not retryable
+            }
+            for input_path in itertools.chain([input_path], inputs):
+                if str(input_path) in done:
+                    stats.skipped += 1
+                else:
+                    yield input_path
+            return
+    yield from inputs
+
+
+def _print_report(line: str) -> None:
+    print(line, file=sys.stderr, flush=True)
+
+
+def ingest_images(
+    source: Path | str | Iterable[Path | str],
+    output: Path | str,
+    api: DecimerAPI | None = None,
+    concurrency: int = 8,
+    hand_drawn: bool = False,
+    classify_image: bool = True,
+    report_every: float = 10.0,
+    report: Callable[[str], Any] | None = _print_report,
+) -> IngestStats:
+    """Converts every image of source and appends one JSON line per image to output.
+
+    Args:
+        source: directory to walk, manifest file, or any iterable of image paths
+        output: JSONL file; items already recorded there are skipped
+        api: client to use (default: DecimerAPI() on localhost with a pool of `concurrency`)
+        concurrency: number of images in flight
+        hand_drawn: Boolean indicating if the images are hand-drawn
+        classify_image: Boolean indicating if the images should be classified
+        report_every: seconds between progress reports
+        report: receives the progress lines (default: print to stderr); None disables it
+
+    Each line holds `input` (the image path), the server response fields or
+    `status_code`/`message` for failed images, and `seconds` (client-side latency).
+    Failures that may pass on a later attempt (connection errors, server busy)
+    also carry `"retryable": true`; a rerun with the same output converts those
+    images again. Unreadable or undecodable images are recorded as failed and
+    do not stop the run.
+    """
+    if api is None:
+        api = DecimerAPI(pool_size=concurrency)
+    if isinstance(source, (str, Path)):
+        source = iter_source(source)
+
+    output = Path(output)
+    stats = IngestStats()
+    inputs = _skip_completed(source, output, _completed_size(output), stats)
+    if INKSCAPE:
+        inputs = api.emf_converter.prefetch(inputs)
+    binary_upload = api._uses_binary_upload()
+
+    def convert(input_path: Path | str) -> dict[str, Any]:
+        start = time.perf_counter()
+        try:
+            result = api._convert_one(
+                0, input_path, hand_drawn, classify_image, binary_upload
+            )
+        except Exception as exc:  # one broken image must not end a long run
+            result = {"status_code": None, "message": f"{type(exc).__name__}: {exc}"}
+        result.pop("index", None)
+        return {
+            "input": str(input_path),
+            **result,
+            "seconds": round(time.perf_counter() - start, 3),
+        }
+
+    last_report = time.monotonic()
+    with open(output, "a", encoding="utf-8") as handle:
+        for record in _map_concurrently(convert, inputs, concurrency):
+            handle.write(json.dumps(record) + "\n")
+            handle.flush()
+            stats.record(record["seconds"], "message" in record)
+            if report and time.monotonic() - last_report >= report_every:
+                report(stats.summary())
+                last_report = time.monotonic()
+
+    if report:
+        report(stats.summary())
+    return stats
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Converts a directory or manifest of images into a JSONL file."
+    )
+    parser.add_argument("source", help="directory of images or manifest file")
+    parser.add_argument("output", help="JSONL file to append the results to")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--hand-drawn", action="store_true")
+    parser.add_argument(
+        "--no-classify", action="store_true", help="skip the image classifier"
+    )
+    parser.add_argument("--report-every", type=float, default=10.0, help="seconds")
+    parser.add_argument(
+        "--priority",
+        choices=("interactive", "bulk"),
+        default="bulk",
+        help="server-side priority lane (default: bulk)",
+    )
+    args = parser.parse_args()
+
+    with DecimerAPI(
+        args.host, args.port, pool_size=args.concurrency, priority=args.priority
+    ) as api:
+        ingest_images(
+            args.source,
+            args.output,
+            api=api,
+            concurrency=args.concurrency,
+            hand_drawn=args.hand_drawn,
+            classify_image=not args.no_classify,
+            report_every=args.report_every,
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
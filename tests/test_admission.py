@@ -0,0 +1,64 @@
+"""
+Admission and scheduling of the priority lanes in decimer_server.
+
+license: MIT
+"""
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+import decimer_server
+from decimer_server import _AdmissionGate, _PrioritySlots
+
+
+def test_interactive_request_admitted_while_bulk_lane_is_saturated():
+    gate = _AdmissionGate(capacity=8, retry_after=1, reserved=2)
+    releases = [gate.acquire(client=f"bulk-{n}", lane="bulk") for n in range(6)]
+
+    with pytest.raises(HTTPException) as rejected:
+        gate.acquire(client="bulk-6", lane="bulk")
+    assert rejected.value.status_code == 503
+
+    interactive = [gate.acquire(client="ui", lane="interactive") for _ in range(2)]
+    assert gate.in_flight == 8
+    with pytest.raises(HTTPException):
+        gate.acquire(client="ui", lane="interactive")
+
+    for release in releases + interactive:
+        release()
+    assert gate.in_flight == 0
+
+
+def test_bulk_batch_is_limited_to_its_lane_capacity():
+    gate = _AdmissionGate(capacity=8, retry_after=1, reserved=2)
+    assert gate.lane_capacity("bulk") == 6
+    assert gate.lane_capacity("interactive") == 8
+    with pytest.raises(HTTPException):
+        gate.acquire(slots=7, lane="bulk")
+    gate.acquire(slots=7, lane="interactive")()
+
+
+def test_waiting_interactive_work_runs_before_queued_bulk_work(monkeypatch):
+    monkeypatch.setattr(decimer_server, "PRIORITY_SCHEDULING", "strict")
+
+    async def scenario() -> list[str]:
+        slots = _PrioritySlots(1)
+        order: list[str] = []
+        await slots.acquire("bulk")
+
+        async def work(name: str, lane: str) -> None:
+            await slots.acquire(lane)
+            order.append(name)
+            slots.release()
+
+        waiting = [asyncio.create_task(work(f"bulk-{n}", "bulk")) for n in range(3)]
+        await asyncio.sleep(0)
+        waiting.append(asyncio.create_task(work("interactive", "interactive")))
+        await asyncio.sleep(0)
+        slots.release()
+        await asyncio.gather(*waiting)
+        return order
+
+    assert asyncio.run(scenario())[0] == "interactive"
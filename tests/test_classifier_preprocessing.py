@@ -0,0 +1,111 @@
+"""
+The batched classifier preprocessing (_get_model_inputs) must produce the same
+model input as the original per-image PIL chain (_get_resized_grayscale_image),
+and the server must hand the classifier the pixels it used to read from a file.
+Needs no model weights.
+
+license: MIT
+"""
+
+import numpy as np
+import pytest
+from PIL import Image
+
+import decimer_server
+from decimer_image_classifier.decimer_image_classifier import DecimerImageClassifier
+
+
+@pytest.fixture
+def classifier() -> DecimerImageClassifier:
+    # Skip __init__, which loads the model; preprocessing only needs reducing_gap.
+    instance = object.__new__(DecimerImageClassifier)
+    instance.reducing_gap = None
+    return instance
+
+
+def _drawing(width: int, height: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    pixels = np.full((height, width, 3), 255, np.uint8)
+    for _ in range(12):
+        top, left = rng.integers(0, height), rng.integers(0, width)
+        pixels[top : top + 3, left : left + width // 3] = rng.integers(0, 200, 3)
+    return pixels
+
+
+def _rgba(width: int, height: int) -> Image.Image:
+    alpha = np.zeros((height, width), np.uint8)
+    alpha[height // 4 : height * 3 // 4, :] = 255
+    alpha[:, width // 2] = 128
+    return Image.fromarray(np.dstack([_drawing(width, height, 1), alpha]), "RGBA")
+
+
+def _palette(width: int, height: int) -> Image.Image:
+    return Image.fromarray(_drawing(width, height, 2)).quantize(16)
+
+
+def _transparent_gif(width: int, height: int, tmp_path) -> Image.Image:
+    img = _palette(width, height)
+    # Make the darkest ink colour transparent, so flattening it onto white
+    # would change the pixels.
+    colours = np.array(img.getpalette()[: 3 * len(img.getcolors())]).reshape(-1, 3)
+    transparent = int(np.argmin(colours.sum(axis=1)))
+    path = tmp_path / "drawing.gif"
+    img.save(path, transparency=transparent)
+    return Image.open(path)
+
+
+CASES = {
+    "odd-landscape": lambda tmp_path: Image.fromarray(_drawing(301, 97)),
+    "odd-portrait": lambda tmp_path: Image.fromarray(_drawing(33, 517)),
+    "square": lambda tmp_path: Image.fromarray(_drawing(224, 224)),
+    "upscaled": lambda tmp_path: Image.fromarray(_drawing(45, 17)),
+    "grayscale": lambda tmp_path: Image.fromarray(_drawing(150, 61)).convert("L"),
+    "rgba": lambda tmp_path: _rgba(257, 129),
+    "palette": lambda tmp_path: _palette(211, 307),
+    "transparent-gif": lambda tmp_path: _transparent_gif(199, 73, tmp_path),
+}
+
+
+@pytest.mark.parametrize("case", CASES)
+def test_model_inputs_match_pil_reference(classifier, case, tmp_path):
+    img = CASES[case](tmp_path)
+    reference = np.asarray(
+        classifier._get_resized_grayscale_image(img), dtype=np.float32
+    )
+    batched = classifier._get_model_inputs([img])
+    assert batched.shape == (1, 224, 224, 3)
+    np.testing.assert_array_equal(batched[0], reference)
+
+
+def test_batch_matches_images_scored_one_by_one(classifier, tmp_path):
+    images = [CASES[case](tmp_path) for case in CASES]
+    batched = classifier._get_model_inputs(images)
+    for index, img in enumerate(images):
+        np.testing.assert_array_equal(
+            batched[index], classifier._get_model_inputs([img])[0]
+        )
+
+
+def test_numpy_and_path_inputs_match_pil_input(classifier, tmp_path):
+    pixels = _drawing(123, 45)
+    path = tmp_path / "drawing.png"
+    Image.fromarray(pixels).save(path)
+    from_pil = classifier._get_model_inputs([Image.fromarray(pixels)])
+    np.testing.assert_array_equal(classifier._get_model_inputs([pixels]), from_pil)
+    np.testing.assert_array_equal(classifier._get_model_inputs([str(path)]), from_pil)
+
+
+@pytest.mark.parametrize("case", ["transparent-gif", "rgba", "palette", "grayscale"])
+def test_server_classifier_input_matches_file_input(classifier, case, tmp_path):
+    # The server used to pass the uploaded file to the classifier by path.
+    img = CASES[case](tmp_path)
+    path = tmp_path / f"upload.{'gif' if case == 'transparent-gif' else 'png'}"
+    if case == "transparent-gif":
+        img.save(path, transparency=img.info["transparency"])
+    else:
+        img.save(path)
+    _, classifier_pixels = decimer_server._decode_pixels(path.read_bytes())
+    np.testing.assert_array_equal(
+        classifier._get_model_inputs([classifier_pixels]),
+        classifier._get_model_inputs([str(path)]),
+    )
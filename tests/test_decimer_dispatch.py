@@ -0,0 +1,43 @@
+"""
+DECIMER inference must keep running on all inference workers in parallel.
+
+license: MIT
+"""
+
+import asyncio
+import time
+
+import numpy as np
+import pytest
+
+import decimer_server
+
+
+@pytest.mark.skipif(
+    decimer_server.INFERENCE_WORKERS < 2, reason="needs at least two inference workers"
+)
+def test_concurrent_images_run_in_parallel(monkeypatch):
+    monkeypatch.setattr(decimer_server, "backend", decimer_server._StubBackend())
+    monkeypatch.setattr(decimer_server, "STUB_LATENCY_MS", 100.0)
+    workers = decimer_server.INFERENCE_WORKERS
+    images = [np.full((4, 4), index, np.uint8) for index in range(workers * 4)]
+
+    async def scenario() -> float:
+        batcher = decimer_server.smiles_batcher
+        batcher.start()
+        try:
+            started = time.perf_counter()
+            results = await asyncio.gather(
+                *(batcher.submit(False, image) for image in images)
+            )
+            elapsed = time.perf_counter() - started
+        finally:
+            await batcher.stop()
+        assert all(isinstance(smiles, str) for smiles in results)
+        return elapsed
+
+    elapsed = asyncio.run(scenario())
+    parallel = len(images) / workers * 0.1
+    serial = len(images) * 0.1
+    # Load check: one image per inference slot, not one group per slot.
+    assert elapsed < (parallel + serial) / 2